@@ -1,82 +1,384 @@
 # Ana Dosya
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response, stream_with_context
 from flask_cors import CORS
 import os
 import sys
-import gc
+import hmac
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-sys.path.append('./model_training/Training/model_training')
+# Yollar çalışma dizininden bağımsız çözülür (gunicorn farklı bir dizinden başlatabilir)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'Data')
+sys.path.append(os.path.join(BASE_DIR, '..', 'model_training', 'Training', 'model_training'))
 from Similarity_Prompt import HybridRecommendationEngine
+from filter_index import FilterError, parse_filters
+from model_registry import get_model, get_batch_encoder, shared_memory_report, query_cache_stats, batch_encoder_stats
+from request_profiler import RequestMemoryProfiler
+from metrics import REGISTRY as metrics_registry, begin_trace, end_trace
 
 app = Flask(__name__)
-CORS(app)
+# Tarayıcıdan sadece öneri endpoint'lerine erişilir; /api/admin/* CORS kapsamı dışındadır
+CORS(app, resources={r"/api/(?!admin/).*": {}})
+
+# Admin endpoint'leri (bellek profili, cache raporu, reload) sadece ADMIN_TOKEN tanımlıysa açılır
+# ve X-Admin-Token başlığıyla çağrılır; tanımlı değilse 404 döner
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Toplu endpoint'te istek başına öneri sayısı sınırı
+MAX_TOP_K = 50
+
+# Bellek profili varsayılan olarak kapalıdır; MEMORY_PROFILE=1 veya admin endpoint ile açılır
+memory_profiler = RequestMemoryProfiler()
+if os.environ.get('MEMORY_PROFILE') == '1':
+    memory_profiler.enable()
+
+def category_table_mode():
+    mode = os.environ.get('CATEGORY_TABLE', 'single')
+    return None if mode == 'off' else mode
+
 
 class SimpleRecommendationAPI:
     def __init__(self):
         self.dataset_paths = {
-            "2_yillik": "./Backend/Data/2yillik_Bolumler_aciklamali_yeni.csv",
-            "sayisal": "./Backend/Data/Sayisal_Bolumler_Aciklamali.csv", 
-            "sozel": "./Backend/Data/Sozel_Bolumler_aciklamali.csv",
-            "esit_agirlik": "./Backend/Data/Esit_Agirlik_Aciklamali.csv"
+            "2_yillik": os.path.join(DATA_DIR, "2yillik_Bolumler_aciklamali_yeni.csv"),
+            "sayisal": os.path.join(DATA_DIR, "Sayisal_Bolumler_Aciklamali.csv"),
+            "sozel": os.path.join(DATA_DIR, "Sozel_Bolumler_aciklamali.csv"),
+            "esit_agirlik": os.path.join(DATA_DIR, "Esit_Agirlik_Aciklamali.csv")
         }
         self.engines = {}
+        # Mikro-batch kuyruğu sadece aynı süreçte eşzamanlı istek işlenebiliyorsa (gthread worker, thread'li
+        # dev sunucusu) fayda sağlar; sync worker'da her cache miss'e boşuna thread geçişi + bekleme penceresi ekler.
+        # Sunucunun thread'li olup olmadığı ilk istekte WSGI environ'dan (wsgi.multithread) öğrenilir.
+        self.concurrent_requests = False
+        self._batching_lock = threading.Lock()
+        # Dataset başına kilit: eşzamanlı ilk istekler aynı engine'i iki kez kurmaz
+        self.build_locks = {name: threading.Lock() for name in self.dataset_paths}
+        self.status = {
+            name: 'pending' if os.path.exists(path) else 'missing'
+            for name, path in self.dataset_paths.items()
+        }
+        self._prewarm_lock = threading.Lock()
+        self._prewarmed = False
+    
+    def _build_engine(self, dataset_type):
+        dataset_path = self.dataset_paths[dataset_type]
+        print(f"Loading AI model for {dataset_type}...")
+        # Tüm engine'ler aynı encoder örneğini paylaşır
+        return HybridRecommendationEngine(
+            dataset_path,
+            model=get_model(),
+            response_cache_size=int(os.environ.get('RESPONSE_CACHE_SIZE', 2048)),
+            response_cache_ttl=float(os.environ.get('RESPONSE_CACHE_TTL', 600)),
+            # Açıklama matrisi tipi: float32 (varsayılan) / float16 / int8
+            embedding_dtype=os.environ.get('EMBEDDING_DTYPE', 'float32'),
+            # Vektör indeksi: exact (varsayılan) / ivf / hnsw (hnswlib gerekir)
+            vector_index=os.environ.get('VECTOR_INDEX', 'exact'),
+            search_depth=int(os.environ.get('VECTOR_SEARCH_DEPTH', 32)),
+            # Kategori x açıklama tablosu: single (varsayılan) / compose / off
+            category_table=category_table_mode(),
+        )
+    
+    def _batch_encoder(self):
+        if not self.concurrent_requests or os.environ.get('ENCODER_BATCHING', '1') == '0':
+            return None
+        return get_batch_encoder(
+            max_batch_size=int(os.environ.get('ENCODER_MAX_BATCH', 32)),
+            max_wait_ms=float(os.environ.get('ENCODER_BATCH_WINDOW_MS', 2))
+        )
+    
+    def _publish_engine(self, dataset_type, engine):
+        # Batch encoder yayın anında bağlanır; set_concurrent_requests ile yarışan kurulum eski ayarla kalmaz
+        with self._batching_lock:
+            engine.batch_encoder = self._batch_encoder()
+            self.engines[dataset_type] = engine
+    
+    def set_concurrent_requests(self, concurrent):
+        """Sunucu eşzamanlı istek işliyorsa yüklü ve sonradan kurulan engine'lere mikro-batch kuyruğunu bağlar"""
+        concurrent = bool(concurrent)
+        if concurrent == self.concurrent_requests:
+            return
+        with self._batching_lock:
+            self.concurrent_requests = concurrent
+            batch_encoder = self._batch_encoder()
+            for engine in self.engines.values():
+                engine.batch_encoder = batch_encoder
+    
+    def _prewarm_query_cache(self, engine):
+        # Sorgu cache'i paylaşıldığı için ön ısıtma süreç başına bir kez yapılır
+        if os.environ.get('PREWARM_QUERY_CACHE', '1') != '1':
+            return
+        with self._prewarm_lock:
+            if not self._prewarmed:
+                engine.prewarm_query_cache()
+                self._prewarmed = True
     
     def get_engine(self, dataset_type):
-        if dataset_type not in self.engines:
-            dataset_path = self.dataset_paths.get(dataset_type)
-            if not dataset_path or not os.path.exists(dataset_path):
-                return None
-            
-            print(f"Loading AI model for {dataset_type}...")
-            self.engines[dataset_type] = HybridRecommendationEngine(dataset_path)
+        engine = self.engines.get(dataset_type)
+        if engine is not None:
+            return engine
         
-        return self.engines[dataset_type]
+        dataset_path = self.dataset_paths.get(dataset_type)
+        if not dataset_path or not os.path.exists(dataset_path):
+            return None
+        
+        with self.build_locks[dataset_type]:
+            engine = self.engines.get(dataset_type)
+            if engine is None:
+                self.status[dataset_type] = 'loading'
+                try:
+                    engine = self._build_engine(dataset_type)
+                except Exception as e:
+                    self.status[dataset_type] = f'failed: {e}'
+                    raise
+                self._prewarm_query_cache(engine)
+                self._publish_engine(dataset_type, engine)
+                self.status[dataset_type] = 'ready'
+        
+        return engine
+    
+    def warm_up(self, max_workers=None):
+        """Tüm dataset'leri paralel kurar; encoder önce bir kez yüklenir"""
+        get_model()
+        available = [name for name, state in self.status.items() if state != 'missing']
+        with ThreadPoolExecutor(max_workers=max_workers or len(available) or 1) as executor:
+            futures = {executor.submit(self.get_engine, name): name for name in available}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"ERROR: warm-up failed for {futures[future]}: {e}")
+        print(f"Warm-up completed: {self.status}")
+    
+    def start_warm_up(self):
+        thread = threading.Thread(target=self.warm_up, name='engine-warm-up', daemon=True)
+        thread.start()
+        return thread
+    
+    def is_ready(self):
+        """Dosyası bulunan tüm dataset'lerin engine'i yüklendiyse True"""
+        return all(state in ('ready', 'missing') for state in self.status.values())
+    
+    def reload_engine(self, dataset_type):
+        """True: yenilendi, False: yüklü değil, None: aynı dataset zaten kuruluyor"""
+        if dataset_type not in self.engines:
+            return False
+        # Yeni engine kilit altında kurulup atomik olarak değiştirilir; eski cevap cache'i onunla gider.
+        # Kurulum boyunca eski engine servis vermeye devam eder, status 'ready' kalır (/api/ready 503 dönmez).
+        # Kurulum hata verirse eski engine yerinde kalır ve hata çağırana iletilir.
+        # Devam eden kurulum varken gelen istekler beklemez, sıraya da girmez (tekrarlanan tam rebuild yok).
+        lock = self.build_locks[dataset_type]
+        if not lock.acquire(blocking=False):
+            return None
+        try:
+            try:
+                engine = self._build_engine(dataset_type)
+            except Exception as e:
+                print(f"ERROR: reload failed for {dataset_type}, keeping the current engine: {e}")
+                raise
+            self._publish_engine(dataset_type, engine)
+        finally:
+            lock.release()
+        return True
+    
+    def memory_report(self):
+        return {
+            'shared_models': shared_memory_report(),
+            'engines': {name: engine.memory_footprint() for name, engine in self.engines.items()}
+        }
 
 recommendation_api = SimpleRecommendationAPI()
 
+def clean_recommendations(recommendations):
+    clean_recommendations = []
+    for rec in recommendations:
+        clean_rec = {
+            'bolum_adi': str(rec.get('bolum_adi', '')),
+            'universite': str(rec.get('universite', '')),
+            'sehir': str(rec.get('sehir', '')),
+            'ranking_2025': int(rec.get('ranking_2025', 0)),
+            'similarity_score': float(rec.get('similarity_score', 0)),
+            'description_preview': str(rec.get('description_preview', ''))
+        }
+        clean_recommendations.append(clean_rec)
+    return clean_recommendations
+
 @app.route('/api/recommend', methods=['POST'])
 def get_recommendations():
     try:
         data = request.json
         user_input = data.get('user_input', '')
         dataset_type = data.get('dataset_type', 'sayisal')
+        # Yapısal filtreler: {"sehir": [...], "tur": [...], "ogrenim_sekli": [...], "max_ucret": 250000, "min_kontenjan": 30}
+        # Engine'e dokunmadan doğrulanır; hatalı filtre 400, engine/config hataları 500 döner
+        filters = parse_filters(data.get('filters'))
         
         engine = recommendation_api.get_engine(dataset_type)
         if not engine:
             return jsonify({'success': False, 'error': f'Dataset bulunamadı: {dataset_type}'}), 404
         
-        recommendations = engine.recommend(user_input, top_k=6)
+        recommendations = clean_recommendations(engine.recommend(user_input, top_k=6, filters=filters))
         
-        clean_recommendations = []
-        for rec in recommendations:
-            clean_rec = {
-                'bolum_adi': str(rec.get('bolum_adi', '')),
-                'universite': str(rec.get('universite', '')),
-                'sehir': str(rec.get('sehir', '')),
-                'ranking_2025': int(rec.get('ranking_2025', 0)),
-                'similarity_score': float(rec.get('similarity_score', 0)),
-                'description_preview': str(rec.get('description_preview', ''))
-            }
-            clean_recommendations.append(clean_rec)
+        return jsonify({
+            'success': True,
+            'recommendations': recommendations,
+            'total_found': len(recommendations)
+        })
+        
+    except FilterError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/recommend/batch', methods=['POST'])
+def get_batch_recommendations():
+    # Toplu danışmanlık listeleri: tüm girdiler tek encode batch'i ve tek matris çarpımıyla skorlanır
+    try:
+        data = request.json
+        user_inputs = data.get('user_inputs', [])
+        dataset_type = data.get('dataset_type', 'sayisal')
+        top_k = data.get('top_k', 6)
+        # Üst sınır hem cevap boyutunu hem (sorgu, top_k) cevap cache'i anahtar çeşitliliğini sınırlar;
+        # null, ondalık, bool veya liste kabul edilmez (int(3.9) / int(True) sessizce kırpılmaz)
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or not 1 <= top_k <= MAX_TOP_K:
+            return jsonify({'success': False, 'error': f'top_k 1 ile {MAX_TOP_K} arasında olmalı'}), 400
+        
+        if not isinstance(user_inputs, list) or not all(isinstance(item, str) for item in user_inputs):
+            return jsonify({'success': False, 'error': 'user_inputs bir metin listesi olmalı'}), 400
+        max_inputs = int(os.environ.get('BATCH_MAX_INPUTS', 10000))
+        if len(user_inputs) > max_inputs:
+            return jsonify({'success': False, 'error': f'En fazla {max_inputs} girdi gönderilebilir'}), 413
+        
+        # Filtreler engine'e dokunmadan ve akış başlamadan doğrulanır; hatalı filtre 400 döner
+        filters = parse_filters(data.get('filters'))
+        
+        engine = recommendation_api.get_engine(dataset_type)
+        if not engine:
+            return jsonify({'success': False, 'error': f'Dataset bulunamadı: {dataset_type}'}), 404
+        results = engine.iter_recommend_many(user_inputs, top_k=top_k, filters=filters)
+        
+        # Büyük listelerde cevap satır satır (NDJSON) akıtılır; sonuçlar girdi sırasındadır
+        if data.get('stream') or 'application/x-ndjson' in request.headers.get('Accept', ''):
+            def generate():
+                for index, recommendations in enumerate(results):
+                    line = {'index': index, 'recommendations': clean_recommendations(recommendations)}
+                    yield json.dumps(line, ensure_ascii=False) + '\n'
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
         return jsonify({
             'success': True,
-            'recommendations': clean_recommendations,
-            'total_found': len(clean_recommendations)
+            'results': [clean_recommendations(recommendations) for recommendations in results],
+            'total_inputs': len(user_inputs)
         })
         
+    except FilterError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"ERROR: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
-    
-    finally:
-        gc.collect()
-        print("Memory cleared after request")
+
+@app.route('/api/filters', methods=['GET'])
+def filter_options():
+    dataset_type = request.args.get('dataset_type', 'sayisal')
+    engine = recommendation_api.get_engine(dataset_type)
+    if not engine:
+        return jsonify({'success': False, 'error': f'Dataset bulunamadı: {dataset_type}'}), 404
+    return jsonify({'success': True, 'filters': engine.filter_options()})
+
+@app.before_request
+def detect_server_threading():
+    # gunicorn --threads, gthread config'i veya başka bir thread'li WSGI sunucusu fark etmeksizin geçerlidir
+    recommendation_api.set_concurrent_requests(request.environ.get('wsgi.multithread', False))
+
+@app.before_request
+def require_admin_token():
+    if not request.path.startswith('/api/admin/'):
+        return None
+    if not ADMIN_TOKEN:
+        return jsonify({'success': False, 'error': 'Admin endpoint\'leri kapalı (ADMIN_TOKEN tanımlı değil)'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'success': False, 'error': 'Geçersiz admin token'}), 401
+    return None
+
+@app.before_request
+def begin_memory_profile():
+    g.memory_token = memory_profiler.begin()
+
+@app.after_request
+def end_memory_profile(response):
+    memory_profiler.end(g.pop('memory_token', None), request.path)
+    return response
+
+@app.before_request
+def begin_request_trace():
+    g.trace = begin_trace()
+
+@app.after_request
+def add_server_timing(response):
+    # Aşama süreleri (ms) tarayıcı devtools / load balancer loglarında görünür.
+    # NDJSON akışında skorlama cevap gönderilirken yapıldığı için sadece extract + total yer alır.
+    trace = g.pop('trace', None)
+    if trace is not None:
+        response.headers['Server-Timing'] = end_trace(trace).server_timing()
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus text formatı; gunicorn'da her worker kendi sayaçlarını raporlar
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy'})
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    ready = recommendation_api.is_ready()
+    return jsonify({'ready': ready, 'datasets': recommendation_api.status}), 200 if ready else 503
+
+@app.route('/api/admin/memory', methods=['GET'])
+def memory_report():
+    report = recommendation_api.memory_report()
+    report['profile'] = memory_profiler.report(include_allocations=request.args.get('allocations') == '1')
+    return jsonify(report)
+
+@app.route('/api/admin/cache', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        'query_embeddings': query_cache_stats(),
+        'encoder_batching': batch_encoder_stats(),
+        'responses': {name: engine.response_cache.stats() for name, engine in recommendation_api.engines.items()}
+    })
+
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_dataset():
+    dataset_type = (request.json or {}).get('dataset_type', '')
+    try:
+        reloaded = recommendation_api.reload_engine(dataset_type)
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Yeniden yükleme başarısız, mevcut engine kullanılmaya devam ediliyor: {e}'}), 500
+    if reloaded is None:
+        return jsonify({'success': False, 'error': f'{dataset_type} zaten yeniden yükleniyor'}), 409
+    if not reloaded:
+        return jsonify({'success': False, 'error': f'Yüklü dataset bulunamadı: {dataset_type}'}), 404
+    return jsonify({'success': True, 'dataset_type': dataset_type})
+
+@app.route('/api/admin/memory/profile', methods=['POST'])
+def toggle_memory_profile():
+    data = request.json or {}
+    if data.get('enabled'):
+        memory_profiler.enable()
+    else:
+        memory_profiler.disable()
+    return jsonify({'enabled': memory_profiler.enabled})
+
 if __name__ == '__main__':
+    # Geliştirme sunucusu; production için Backend/gunicorn.conf.py kullanılır
     print("AI Backend başlatılıyor...")
-    app.run(debug=True, host='0.0.0.0', port=8000)
\ No newline at end of file
+    debug = os.environ.get('FLASK_DEBUG', '1') == '1'
+    # Reloader açıkken modeli sadece çocuk süreç yükler
+    if (not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true') and os.environ.get('WARMUP_ON_START', '1') == '1':
+        recommendation_api.start_warm_up()
+    app.run(debug=debug, host='0.0.0.0', port=int(os.environ.get('PORT', 8000)))
@@ -0,0 +1,28 @@
+# gunicorn ayarları - production sunum modu
+# Çalıştırma (repo kökünden veya herhangi bir dizinden):
+#   gunicorn -c Backend/gunicorn.conf.py
+import os
+import multiprocessing
+
+_backend_dir = os.path.dirname(os.path.abspath(__file__))
+
+wsgi_app = 'wsgi:app'
+pythonpath = _backend_dir
+chdir = os.path.dirname(_backend_dir)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# GUNICORN_THREADS > 1 ise thread'li worker: eşzamanlı isteklerin encode çağrıları mikro-batch'te birleşir
+# (Backend, thread'li sunucuyu wsgi.multithread'den algılar)
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+# Model ve embedding'ler master'da bir kez yüklenir, fork ile worker'lara paylaşılır
+preload_app = True
+
+
+def post_fork(server, worker):
+    # preload_app ile Backend (ve model_registry yolu) fork'tan önce yüklenmiştir
+    from model_registry import set_torch_threads
+    set_torch_threads(int(os.environ.get('TORCH_NUM_THREADS', 1)))
@@ -0,0 +1,137 @@
+# Lokal yük testi: eşzamanlı isteklerle p50/p99 gecikme ve throughput ölçer
+# Kullanım:
+#   python Backend/load_benchmark.py --concurrency 16 --requests 400
+#   python Backend/load_benchmark.py --encoder --concurrency 16 --requests 400
+# --encoder modu sunucu olmadan, aynı süreçte tekil model.encode çağrılarını mikro-batch kuyruğuyla
+# karşılaştırır (HTTP testinde sorgu cache'i çoğu isteği encoder'a uğratmadan cevaplar).
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_PROMPTS = [
+    "sanat ve tasarım çok seviyorum 120 bin sıralama",
+    "mühendislik istiyorum tıp istemiyorum 50 bin",
+    "hukuk okumak istiyorum avukat olmak istiyorum 20 bin",
+    "sağlık alanı istiyorum 450k sıralama",
+    "öğretmen olmak istiyorum, teknoloji sevmiyorum 300.000",
+    "yazılım geliştirmek ve oyun yapmak istiyorum",
+    "spor ve fitness, antrenör olmak istiyorum sıralamam 800000",
+    "finans sektöründe bankacı olmak istiyorum 35 bin"
+]
+
+
+def send(url, payload):
+    body = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        # 4xx/5xx cevaplar testi durdurmaz, hata olarak sayılır
+        e.read()
+        status = e.code
+    except urllib.error.URLError:
+        # Bağlantı hatası (ör. sunucu yük altında bağlantıyı reddetti)
+        status = 0
+    return time.perf_counter() - started, status
+
+
+def run(base_url, endpoint, dataset_type, concurrency, total_requests, prompts):
+    url = base_url.rstrip('/') + endpoint
+    # Her isteğe benzersiz sıralama verilir; cevap cache'i yerine encode/skorlama yolu ölçülür
+    payloads = [
+        {'user_input': f"{prompt} {1000 + i * 37}", 'dataset_type': dataset_type}
+        for i, prompt in zip(range(total_requests), itertools.cycle(prompts))
+    ]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda payload: send(url, payload), payloads))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(1 for _, status in results if status != 200)
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': total_requests,
+        'errors': errors,
+        'throughput_rps': round(total_requests / elapsed, 2),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_ms': round(float(latencies.mean()), 2)
+    }
+
+
+def _measure(fn, inputs, concurrency):
+    def timed(item):
+        started = time.perf_counter()
+        fn(item)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = np.array(list(executor.map(timed, inputs))) * 1000
+    elapsed = time.perf_counter() - started
+    return {
+        'throughput_per_s': round(len(inputs) / elapsed, 2),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_ms': round(float(latencies.mean()), 2)
+    }
+
+
+def run_encoder_benchmark(concurrency, total_requests, max_batch_size, max_wait_ms):
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model_training', 'Training', 'model_training'))
+    from model_registry import get_model
+    from encoder_batcher import MicroBatchEncoder
+
+    model = get_model()
+    texts = [f"{prompt} #{i}" for i, prompt in zip(range(total_requests), itertools.cycle(DEFAULT_PROMPTS))]
+    batcher = MicroBatchEncoder(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    batcher.encode(texts[0])
+
+    direct = _measure(lambda text: model.encode([text], normalize_embeddings=True), texts, concurrency)
+    batched = _measure(batcher.encode, texts, concurrency)
+    return {
+        'concurrency': concurrency,
+        'requests': total_requests,
+        'direct': direct,
+        'micro_batched': batched,
+        'batcher': batcher.stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BölümBul backend yük testi')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--endpoint', default='/api/recommend')
+    parser.add_argument('--dataset-type', default='sayisal')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--encoder', action='store_true', help='HTTP yerine süreç içi encoder karşılaştırması')
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.encoder:
+        report = run_encoder_benchmark(args.concurrency, args.requests, args.max_batch, args.window_ms)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    report = run(args.url, args.endpoint, args.dataset_type, args.concurrency, args.requests, DEFAULT_PROMPTS)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
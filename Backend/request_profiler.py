@@ -0,0 +1,116 @@
+# İstek bazlı bellek profili (opsiyonel)
+# Her istekte gc.collect() çağırmak yerine bellek davranışı burada ölçülür:
+# tracemalloc farkları, gc istatistikleri ve RSS değişimi istek başına kaydedilir.
+# Eşzamanlı isteklerde farklar süreç geneli olduğu için yaklaşık değerlerdir.
+import gc
+import os
+import time
+import threading
+import tracemalloc
+from collections import deque
+
+
+def current_rss_bytes() -> int:
+    """Sürecin anlık RSS değeri (Linux'ta /proc, diğerlerinde ru_maxrss)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS byte, Linux KB döner
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def _gc_collections():
+    return [generation['collections'] for generation in gc.get_stats()]
+
+
+class RequestMemoryProfiler:
+    def __init__(self, max_records: int = 200, trace_frames: int = 1):
+        self.enabled = False
+        self.trace_frames = trace_frames
+        self.records = deque(maxlen=max_records)
+        self.request_count = 0
+        self._baseline = None
+        self._lock = threading.Lock()
+
+    def enable(self):
+        with self._lock:
+            if self.enabled:
+                return
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.trace_frames)
+            self._baseline = tracemalloc.take_snapshot()
+            self.records.clear()
+            self.request_count = 0
+            self.enabled = True
+
+    def disable(self):
+        with self._lock:
+            if not self.enabled:
+                return
+            self.enabled = False
+            self._baseline = None
+            tracemalloc.stop()
+
+    def begin(self):
+        if not self.enabled or not tracemalloc.is_tracing():
+            return None
+        tracemalloc.reset_peak()
+        traced_current, _ = tracemalloc.get_traced_memory()
+        return {
+            'started': time.perf_counter(),
+            'rss': current_rss_bytes(),
+            'traced': traced_current,
+            'gc_collections': _gc_collections()
+        }
+
+    def end(self, token, endpoint: str):
+        if token is None or not self.enabled or not tracemalloc.is_tracing():
+            return
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        collections = _gc_collections()
+        record = {
+            'endpoint': endpoint,
+            'duration_ms': round((time.perf_counter() - token['started']) * 1000, 3),
+            'rss_delta_bytes': current_rss_bytes() - token['rss'],
+            'traced_delta_bytes': traced_current - token['traced'],
+            'traced_peak_bytes': traced_peak - token['traced'],
+            'gc_collections_delta': [after - before for before, after in zip(token['gc_collections'], collections)]
+        }
+        with self._lock:
+            self.request_count += 1
+            self.records.append(record)
+
+    def top_allocations(self, limit: int = 10):
+        """Profil açıldığından beri en çok büyüyen allocation noktaları"""
+        if not self.enabled or self._baseline is None:
+            return []
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self._baseline, 'lineno')[:limit]
+        return [
+            {'location': str(stat.traceback), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+            for stat in stats
+        ]
+
+    def report(self, include_allocations: bool = False):
+        with self._lock:
+            records = list(self.records)
+            request_count = self.request_count
+        report = {
+            'enabled': self.enabled,
+            'rss_bytes': current_rss_bytes(),
+            'gc_counts': list(gc.get_count()),
+            'gc_stats': gc.get_stats(),
+            'profiled_requests': request_count,
+            'recent_requests': records
+        }
+        if self.enabled:
+            traced_current, _ = tracemalloc.get_traced_memory()
+            report['traced_bytes'] = traced_current
+        if include_allocations:
+            report['top_allocations'] = self.top_allocations()
+        return report
@@ -0,0 +1,19 @@
+# Production WSGI giriş noktası
+# gunicorn preload_app ile master süreçte bu modül bir kez import edilir: model, embedding'ler
+# (mmap) ve kural tabloları fork'tan önce yüklenir, worker'lar bunları copy-on-write paylaşır.
+import gc
+import os
+
+from Backend import app, recommendation_api
+from model_registry import set_torch_threads
+
+# Her worker tek thread ile çalışır; paralellik worker sayısından gelir. Fork öncesi master'ın
+# OpenMP thread havuzu açmaması için ayar warm-up'tan önce yapılır. ENCODER_BACKEND=onnx ise torch import edilmez.
+set_torch_threads(int(os.environ.get('TORCH_NUM_THREADS', 1)))
+
+if os.environ.get('WARMUP_ON_START', '1') == '1':
+    recommendation_api.warm_up()
+
+# Yüklenen nesneler kalıcı nesil'e taşınır; worker'lardaki GC taramaları bu sayfalara yazıp
+# copy-on-write kopyalamasına yol açmaz
+gc.freeze()
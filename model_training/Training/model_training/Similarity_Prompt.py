@@ -1,26 +1,110 @@
 #Ana çalışan modelimizdir Read-me içinde temel çalışma prensibi anlatılmıştır
 import pandas as pd
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import sys
 import json
 import logging
+from typing import NamedTuple, Optional, Tuple
+
+from model_registry import DEFAULT_MODEL_NAME, get_model, get_query_cache, encoder_backend, encoder_key
+from query_cache import normalize_interests
+from embedding_cache import load_or_encode, backend_cache_path
+from dataset_loader import load_departments
+from department_store import DepartmentStore
+from filter_index import DepartmentFilters, FilterIndex, parse_filters
+from vector_index import build_index
+from quantized_embeddings import quantize_embeddings
+from category_table import CATEGORY_TABLE_MODES, load_or_build as load_or_build_category_table
+from interest_rules import InterestRuleEngine
+from response_cache import ResponseCache
+from metrics import timed, record_cache, record_candidates, record_encoder_batch
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class RecommendationQuery(NamedTuple):
+    """Kullanıcı metninden çıkarılan, skorlamayı tek başına belirleyen sorgu (cevap cache anahtarı)"""
+    interests: str
+    ranking_window: Optional[Tuple[int, int]]
+    negated_categories: Tuple[int, ...]
+    positive_boost_categories: Tuple[str, ...]
+    filters: DepartmentFilters = DepartmentFilters()
+
+def select_top_k(scores, candidate_indices, top_k: int):
+    """En yüksek top_k skorun pozisyonları; eşit skorlarda küçük satır indeksi önce gelir"""
+    if top_k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    if len(scores) > top_k:
+        partition = np.argpartition(scores, len(scores) - top_k)[len(scores) - top_k:]
+        threshold = scores[partition].min()
+        
+        # Sınırdaki eşitlikler satır sırasına göre çözülür (eski stable sort ile aynı sonuç)
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)
+        ties = ties[np.argsort(candidate_indices[ties], kind='stable')[:top_k - len(above)]]
+        selected = np.concatenate([above, ties])
+    else:
+        selected = np.arange(len(scores))
+    
+    order = np.lexsort((candidate_indices[selected], -scores[selected]))
+    return selected[order]
+
 class HybridRecommendationEngine:
     """
     Geliştirilmiş Hybrid model - Hard reset sonrası optimize edilmiş versiyon
     """
     
-    def __init__(self, dataset_path: str):
-        self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-        self.departments_df = None
+    def __init__(self, dataset_path: str, model_name: str = DEFAULT_MODEL_NAME, model=None,
+                 use_embedding_cache: bool = True, rules_path: str = None, query_cache=None,
+                 response_cache_size: int = 2048, response_cache_ttl: float = 600.0, batch_encoder=None,
+                 vector_index: str = 'exact', vector_index_params: dict = None, search_depth: int = 32,
+                 embedding_dtype: str = 'float32', category_table: str = None):
+        # Model süreç genelinde paylaşılır, engine başına yeniden yüklenmez
+        self.model_name = model_name
+        self.model = model if model is not None else get_model(model_name)
+        # Cache anahtarı backend'i de içerir: int8 ONNX embedding'leri torch cache'iyle karışmaz
+        self.encoder_key = encoder_key(model_name, encoder_backend(self.model))
+        self.cache_dataset_path = backend_cache_path(dataset_path, encoder_backend(self.model))
+        # Sorgu embedding cache'i aynı modeli kullanan tüm engine'ler arasında paylaşılır
+        self.query_cache = query_cache if query_cache is not None else get_query_cache(self.encoder_key)
+        # Verilirse cache miss'ler eşzamanlı isteklerle birlikte mikro-batch halinde encode edilir
+        self.batch_encoder = batch_encoder
+        # Benzersiz açıklamalar üzerinde vektör indeksi: 'exact' (varsayılan), 'ivf' veya 'hnsw'.
+        # Yaklaşık backend'lerde skorlama indeksin döndürdüğü en yakın search_depth açıklamayla sınırlanır
+        self.vector_index_kind = vector_index
+        self.vector_index_params = vector_index_params or {}
+        self.search_depth = search_depth
+        self.vector_index = None
+        # Kategori x açıklama benzerlik tablosu: None (kapalı), 'single' (tek kategorili sorgular tablodan)
+        # veya 'compose' (çok kategorili sorgular da kategori vektörlerinin normalize toplamıyla)
+        if category_table is not None and category_table not in CATEGORY_TABLE_MODES:
+            raise ValueError(f"Bilinmeyen kategori tablosu modu: {category_table}")
+        self.category_table_mode = category_table
+        self.category_table = None
+        self.response_cache = ResponseCache(max_size=response_cache_size, ttl_seconds=response_cache_ttl)
+        self.dataset_path = dataset_path
+        self.use_embedding_cache = use_embedding_cache
+        # Açıklama matrisinin bellekte tutulma tipi: float32 (varsayılan), float16 veya int8 (satır ölçekli)
+        self.embedding_dtype = embedding_dtype
+        self.rules = InterestRuleEngine.from_file(rules_path)
+        self.store = None
         self.department_embeddings = None
+        self.description_index = None
+        self.unique_descriptions = None
+        self.load_report = None
+        self.ranking_order = None
+        self.sorted_rankings = None
+        self.all_indices = None
+        self.filter_index = None
+        self.text_index = None
+        self.keyword_matrix = None
+        self.name_index = None
+        self.negative_membership = None
 
         self.load_dataset(dataset_path)
         self.prepare_embeddings()
+        logger.info(f"Engine memory footprint: {self.memory_footprint()}")
         
         # HARD RESET: Her işlem sonrası sistem temizlenir
         logger.info("Backend hard reset - sistem temizlendi")
@@ -28,97 +112,84 @@ class HybridRecommendationEngine:
     def load_dataset(self, dataset_path: str):
         logger.info(f"Loading dataset from {dataset_path}")
 
-        df = pd.read_csv(dataset_path, dtype=str)
-        df = df.dropna(subset=['Aciklama', 'bolum_adi'])
-        
-        rankings = []
-        valid_rows = []
-        
-        for idx, row in df.iterrows():
-            ranking_value = row['2025_Taban_Sıralama']
-            
-            try:
-                if pd.isna(ranking_value) or ranking_value == '':
-                    continue
-                    
-                ranking_str = str(ranking_value).strip()
-                
-                if ',' in ranking_str:
-                    continue
-                    
-                if '.' in ranking_str:
-                    clean_value = ranking_str.replace('.', '')
-                else:
-                    clean_value = ranking_str
-                    
-                ranking_int = int(clean_value)
-                
-                rankings.append(ranking_int)
-                valid_rows.append(idx)
-                
-            except:
-                continue
-        
-        df_clean = df.iloc[valid_rows].copy()
-        df_clean['ranking_2025'] = rankings
-        df_clean = df_clean.reset_index(drop=True)
-        
-        self.departments_df = df_clean
-        logger.info(f"Loaded {len(df_clean)} clean departments")
+        # Sıralama/puan kolonları satır satır değil, pandas string işlemleriyle parse edilir
+        df_clean, report = load_departments(dataset_path)
+        
+        # DataFrame sadece yükleme içindir; sıcak yol kolon bazlı depoyu kullanır
+        self.store = DepartmentStore.from_dataframe(df_clean)
+        self.load_report = report
+        self.build_ranking_index()
+        self.build_filter_index()
+        self.build_keyword_index()
+        self.build_negative_index()
+        logger.info(f"Loaded {len(self.store)} clean departments ({self.store.nbytes} bytes columnar, "
+                    f"{int(df_clean.memory_usage(deep=True).sum())} bytes as DataFrame)")
+        logger.info(f"Rejected {report['rejected_rows']} rows: {report['rejected_by_reason']}")
         
         # HARD RESET: Veri yükleme sonrası temizlik
         logger.info("Dataset loading completed - hard reset")
         
-        return df_clean
+        return self.store
         
     def prepare_embeddings(self):
         logger.info("Creating embeddings for department descriptions...")
         
-        self.departments_df = self.departments_df.reset_index(drop=True)
-        descriptions = self.departments_df['Aciklama'].tolist()
-        self.department_embeddings = self.model.encode(descriptions, show_progress_bar=True)
+        # Aynı bölümün açıklaması her üniversitede tekrarlanır; her benzersiz açıklama bir kez encode edilir
+        descriptions = self.store.strings['Aciklama']
+        self.description_index = descriptions.codes
+        self.unique_descriptions = descriptions.values()
+        logger.info(f"{len(self.description_index)} rows -> {len(self.unique_descriptions)} unique descriptions")
+        
+        # Embedding'ler bir kez L2-normalize edilir; benzerlik düz matris-vektör çarpımı olur
+        if self.use_embedding_cache:
+            # Warm start: CSV yanındaki .npy cache'i mmap ile açılır, encoder çalışmaz
+            self.department_embeddings = load_or_encode(
+                self.model, self.encoder_key, self.unique_descriptions, self.cache_dataset_path,
+                show_progress_bar=True, normalize_embeddings=True
+            )
+        else:
+            self.department_embeddings = np.ascontiguousarray(
+                self.model.encode(self.unique_descriptions, show_progress_bar=True, normalize_embeddings=True),
+                dtype=np.float32
+            )
+        
+        if self.embedding_dtype != 'float32':
+            float32_bytes = int(self.department_embeddings.nbytes)
+            self.department_embeddings = quantize_embeddings(self.department_embeddings, self.embedding_dtype)
+            logger.info(f"Embeddings stored as {self.embedding_dtype}: {float32_bytes} -> {self.department_embeddings.nbytes} bytes")
+        
+        index_params = dict(self.vector_index_params)
+        if self.vector_index_kind == 'hnsw':
+            # Aramada istenen derinlik grafın ef'ine kurulumda yansıtılır
+            index_params.setdefault('search_depth', self.search_depth)
+        self.vector_index = build_index(self.vector_index_kind, self.department_embeddings, **index_params)
+        
+        if self.category_table_mode is not None:
+            self.category_table = load_or_build_category_table(
+                self.model, self.encoder_key, self.embedding_dtype, self.rules.interest_categories,
+                self.unique_descriptions, self.department_embeddings, self.cache_dataset_path,
+                # Disk cache'i kapalıysa tablo da diske yazılmaz / diskten okunmaz
+                persist=self.use_embedding_cache
+            )
         
         logger.info("Embeddings created successfully - hard reset")
     
+    def memory_footprint(self):
+        """Engine'e ait veri yapılarının byte cinsinden boyutu (paylaşılan model hariç)"""
+        store_bytes = self.store.nbytes if self.store is not None else 0
+        embedding_bytes = 0
+        if self.department_embeddings is not None:
+            embedding_bytes = int(self.department_embeddings.nbytes)
+        index_bytes = self.vector_index.memory_bytes() if self.vector_index is not None else 0
+        return {
+            'store_bytes': store_bytes,
+            'embedding_bytes': embedding_bytes,
+            'vector_index_bytes': index_bytes,
+            'total_bytes': store_bytes + embedding_bytes + index_bytes
+        }
+    
     def extract_interests_and_ranking(self, user_input: str):
-        import re
-        
-        # Ranking extraction patterns
-        ranking_patterns = [
-            r'(?:YKS sıralamasi|sıralama|sıralamam):?\s*(\d+(?:\.\d{3})*k?)',
-            r'sıralamam\s+(\d+(?:\.\d{3})*k?)',
-            r'(\d+)\s*bin',
-            r'(\d+k?)\s*sıralama',
-            r'(\d{1,3}(?:\.\d{3})+)',
-            r'(\d{4,7})',
-            r'sıralama.*?(\d+(?:\.\d{3})*k?)'
-        ]
-        
-        ranking = None
-        for pattern in ranking_patterns:
-            ranking_match = re.search(pattern, user_input, re.IGNORECASE)
-            if ranking_match:
-                rank_str = ranking_match.group(1)
-                
-                try:
-                    if ',' in rank_str:
-                        continue
-                    
-                    if 'bin' in user_input.lower() and not 'k' in rank_str:
-                        ranking = int(rank_str) * 1000
-                    elif 'k' in rank_str.lower():
-                        ranking = int(float(rank_str.lower().replace('k', '')) * 1000)
-                    elif '.' in rank_str and len(rank_str) > 4:
-                        ranking = int(rank_str.replace('.', ''))
-                    else:
-                        ranking = int(rank_str)
-
-                    if ranking:
-                        break
-                        
-                except (ValueError, TypeError):
-                    continue
-        
+        ranking = self.rules.extract_ranking(user_input)
         interests_keywords = self.extract_career_interests(user_input)
         
         # HARD RESET: Interest extraction sonrası temizlik
@@ -128,435 +199,429 @@ class HybridRecommendationEngine:
     
     def extract_career_interests(self, text: str):
         """Geliştirilmiş interest extraction - pozitif ve negatif algılama"""
-        import re
-        
-        text_lower = text.lower()
-        extracted_interests = set()
-        excluded_interests = set()
-        positive_boost = set()  # YENI: Pozitif ifadeler için boost
-        
-        # Pozitif pattern'ler - bunlar boost alacak
-        positive_patterns = {
-            'teknoloji': [
-                r'teknoloji.*?(?:seviyorum|istiyorum|çok.*?iyi|harika)',
-                r'(?:çok.*?seviyorum|bayılıyorum).*?teknoloji',
-                r'bilgisayar.*?(?:seviyorum|çok.*?iyi|harika)'
-            ],
-            'sağlık': [
-                r'sağlık.*?(?:seviyorum|istiyorum|çok.*?önemli)',
-                r'(?:çok.*?seviyorum|bayılıyorum).*?sağlık',
-                r'hasta.*?(?:yardım.*?seviyorum|seviyorum)'
-            ],
-            'sanat': [
-                r'sanat.*?(?:seviyorum|istiyorum|çok.*?yaratıcı)',
-                r'(?:çok.*?seviyorum|bayılıyorum).*?sanat',
-                r'tasarım.*?(?:seviyorum|çok.*?iyi)'
-            ],
-            'mühendislik': [
-                r'mühendislik.*?(?:seviyorum|istiyorum|çok.*?iyi)',
-                r'(?:çok.*?seviyorum|bayılıyorum).*?mühendislik'
-            ],
-            'hukuk': [
-                r'hukuk.*?(?:seviyorum|istiyorum|çok.*?iyi)',
-                r'avukat.*?(?:seviyorum|çok.*?istiyorum)'
-            ]
-        }
-        
-        # Negatif pattern'ler - bunlar exclude edilecek
-        negative_patterns = {
-            'teknoloji': [
-                r'teknoloji.*?(?:sevmiyorum|istemiyorum|olmasın)',
-                r'(?:sevmiyorum|istemiyorum).*?teknoloji',
-                r'bilgisayar.*?(?:sevmiyorum|kötüyüm)'
-            ],
-            'sağlık': [
-                r'sağlık.*?(?:sevmiyorum|istemiyorum)',
-                r'tıp.*?(?:sevmiyorum|zor|istemiyorum)',
-                r'kan.*?(?:korkuyorum|sevmiyorum)'
-            ],
-            'matematik': [
-                r'matematik.*?(?:sevmiyorum|kötüyüm|zor)',
-                r'sayısal.*?(?:kötüyüm|sevmem)'
-            ],
-            'mühendislik': [
-                r'mühendislik.*?(?:sevmiyorum|istemiyorum)',
-                r'teknik.*?(?:sevmiyorum|zor)'
-            ],
-            'hukuk': [
-                r'hukuk.*?(?:sevmiyorum|istemiyorum|sıkıcı)',
-                r'avukat.*?(?:sevmiyorum|istemiyorum)'
-            ]
-        }
-        
-        # Check positive patterns first (BOOST)
-        for category, patterns in positive_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    positive_boost.add(category)
-                    extracted_interests.add(category)
-                    break
-        
-        # Check negative patterns (EXCLUDE)
-        for category, patterns in negative_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    excluded_interests.add(category)
-                    break
-        
-        # Normal career patterns
-        career_patterns = {
-            'sağlık': [
-                r'(?:doktor|hekim|tıp).*?(?:olmak|istiyorum)',
-                r'sağlık.*?(?:sektör|alan|çalışmak)',
-                r'hasta.*?(?:bakım|tedavi)',
-                r'(?:hemşire|eczacı|veteriner).*?(?:olmak|çalış)',
-                r'tıbbi.*?(?:cihaz|teknoloji|analiz)'
-            ],
-            'sanat': [
-                r'(?:sanat|tasarım).*?(?:yapmak|alan)',
-                r'grafik.*?(?:tasarım|yapmak)',
-                r'yaratıcı.*?(?:iş|alan)',
-                r'(?:müzik|sinema|fotoğraf).*?(?:yapmak|alan)',
-                r'görsel.*?(?:sanat|tasarım)'
-            ],
-            'teknoloji': [
-                r'(?:programcı|developer).*?(?:olmak|istiyorum)',
-                r'yazılım.*?(?:geliştir|yapmak)',
-                r'bilgisayar.*?(?:program|mühendis)',
-                r'web.*?(?:site|tasarım|geliştir)',
-                r'(?:oyun|mobil).*?(?:geliştir|yapmak)'
-            ],
-            'mühendislik': [
-                r'(?:mühendis|mühendislik).*?(?:olmak|istiyorum)',
-                r'(?:makina|elektrik|inşaat).*?mühendis',
-                r'teknik.*?(?:çalışmak|alan)',
-                r'proje.*?(?:yapmak|geliştir)',
-                r'sistem.*?(?:tasarım|geliştir)'
-            ],
-            'hukuk': [
-                r'(?:avukat|hukuk).*?(?:olmak|istiyorum)',
-                r'hukuk.*?(?:alan|okunak|çalışmak|bölüm)',
-                r'adalet.*?(?:sistem|alan)',
-                r'dava.*?(?:takip|savunma)',
-                r'(?:hâkim|savcı).*?(?:olmak|istiyorum)'
-            ],
-            'finans': [
-                r'(?:bankacı|banker).*?(?:olmak|çalış)',
-                r'finans.*?(?:sektör|alan|uzman)',
-                r'borsa.*?(?:çalış|analiz)',
-                r'muhasebe.*?(?:yapmak|çalış)',
-                r'yatırım.*?(?:uzman|danışman)'
-            ],
-            'işletme': [
-                r'işletme.*?(?:çalış|yönetim)',
-                r'pazarlama.*?(?:yapmak|çalış)',
-                r'yönetici.*?(?:olmak|çalış)',
-                r'girişimci.*?(?:olmak|iş.*?kurmak)',
-                r'satış.*?(?:yapmak|uzman)'
-            ],
-            'eğitim': [
-                r'öğretmen.*?(?:olmak|istiyorum)',
-                r'eğitim.*?(?:vermek|çalışmak)',
-                r'ders.*?(?:vermek|anlatmak)',
-                r'çocuk.*?(?:gelişim|eğitim)',
-                r'akademisyen.*?(?:olmak|çalış)'
-            ],
-            'spor': [
-                r'antrenör.*?(?:olmak|çalış)',
-                r'spor.*?(?:alan|yapmak)',
-                r'fitness.*?(?:antrenör|çalış)',
-                r'beden.*?eğitim.*?(?:öğretmen|çalış)',
-                r'egzersiz.*?(?:uzman|çalış)'
-            ],
-            'gastronomi': [
-                r'aşçı.*?(?:olmak|çalış)',
-                r'mutfak.*?(?:çalış|şef)',
-                r'yemek.*?(?:yapmak|pişirmek)',
-                r'gastronomi.*?(?:çalış|alan)',
-                r'restoran.*?(?:açmak|yönetim)'
-            ],
-            'medya': [
-                r'gazeteci.*?(?:olmak|çalış)',
-                r'medya.*?(?:çalış|sektör)',
-                r'televizyon.*?(?:çalış|program)',
-                r'sosyal.*?medya.*?(?:uzman|çalış)',
-                r'reklam.*?(?:yapmak|çalış)'
-            ],
-            'turizm': [
-                r'turizm.*?(?:çalış|rehber)',
-                r'otel.*?(?:çalış|yönetim)',
-                r'seyahat.*?(?:acenta|rehber)',
-                r'tur.*?(?:rehber|operatör)',
-                r'konaklama.*?(?:çalış|yönetim)'
-            ]
-        }
-        
-        # Check normal career patterns
-        for category, patterns in career_patterns.items():
-            if category not in excluded_interests:
-                for pattern in patterns:
-                    if re.search(pattern, text_lower):
-                        extracted_interests.add(category)
-                        break
-        
-        # Direct keyword matching
-        context_keywords = {
-            'sağlık': ['sağlık', 'doktor', 'hemşire', 'tıp'],
-            'teknoloji': ['teknoloji', 'yazılım', 'program', 'kod'],
-            'sanat': ['sanat', 'tasarım', 'yaratıcı', 'grafik'],
-            'spor': ['spor', 'antrenör', 'fitness'],
-            'hukuk': ['hukuk', 'avukat', 'mahkeme', 'dava'],
-            'finans': ['finans', 'banka', 'muhasebe'],
-            'işletme': ['işletme', 'pazarlama', 'yönetim'],
-            'eğitim': ['öğretmen', 'eğitim', 'ders'],
-            'gastronomi': ['aşçı', 'mutfak', 'yemek'],
-            'turizm': ['turizm', 'otel', 'seyahat'],
-            'mühendislik': ['mühendislik', 'mühendis', 'teknik'],
-            'güvenlik': ['güvenlik', 'polis', 'asker'],
-            'tarım': ['tarım', 'ziraat', 'hayvancılık'],
-            'medya': ['medya', 'gazete', 'haber']
-        }
-        
-        for category, keywords in context_keywords.items():
-            if category not in excluded_interests:
-                for keyword in keywords:
-                    if keyword in text_lower:
-                        extracted_interests.add(category)
-                        break
-        
-        final_interests = extracted_interests - excluded_interests
-        
-        # Return interests with positive boost info
-        result = list(final_interests) if final_interests else ['genel']
+        # Kurallar engine kurulurken derlenmiştir (interest_rules.json)
+        result, positive_boost, _ = self.rules.extract(text)
         
         # Store positive boost for later use
         self.positive_boost_categories = positive_boost
         
         return result
     
-    def filter_by_ranking(self, ranking: int, tolerance_percent: float = 0.20):
+    def build_ranking_index(self):
+        """ranking_2025'e göre sıralı dizi ve satır permütasyonu - aralık sorguları için"""
+        rankings = self.store['ranking_2025']
+        self.ranking_order = np.argsort(rankings, kind='stable').astype(np.int32)
+        self.sorted_rankings = rankings[self.ranking_order]
+        self.all_indices = np.arange(len(rankings), dtype=np.int32)
+    
+    def build_filter_index(self):
+        """Şehir/tür/öğrenim şekli posting list'leri (ranking sırasıyla) - yapısal filtreler için"""
+        self.filter_index = FilterIndex(self.store, self.ranking_order, self.sorted_rankings)
+    
+    def filter_options(self):
+        """API'de kullanılabilecek kategori filtre değerleri"""
+        return self.filter_index.options()
+    
+    @staticmethod
+    def ranking_window(ranking: int, tolerance_percent: float = 0.20):
         if ranking is None:
-            return self.departments_df.index.tolist()
-        
+            return None
         tolerance_value = int(ranking * tolerance_percent)
-        min_rank = max(1, ranking - tolerance_value)
-        max_rank = ranking + tolerance_value
-            
-        filtered_indices = self.departments_df[
-            (self.departments_df['ranking_2025'] >= min_rank) & 
-            (self.departments_df['ranking_2025'] <= max_rank)
-        ].index.tolist()
+        return max(1, ranking - tolerance_value), ranking + tolerance_value
+    
+    def candidates_in_window(self, ranking_window):
+        """Pencere içindeki satırlar - sıralı dizide O(log n) arama + view"""
+        if ranking_window is None:
+            return self.all_indices
+        
+        min_rank, max_rank = ranking_window
+        # ±%tolerans penceresi sıralı dizide bitişik bir aralıktır
+        start = np.searchsorted(self.sorted_rankings, min_rank, side='left')
+        end = np.searchsorted(self.sorted_rankings, max_rank, side='right')
+        return self.ranking_order[start:end]
+    
+    def filter_by_ranking(self, ranking: int, tolerance_percent: float = 0.20):
+        ranking_window = self.ranking_window(ranking, tolerance_percent)
+        filtered_indices = self.candidates_in_window(ranking_window)
         
-        logger.info(f"Ranking: {ranking}, Tolerance: %{tolerance_percent*100} = ±{tolerance_value}")
-        logger.info(f"Range: {min_rank} - {max_rank}")
-        logger.info(f"Filtered to {len(filtered_indices)} departments")
+        if ranking_window is not None:
+            logger.info(f"Ranking: {ranking}, Tolerance: %{tolerance_percent*100}")
+            logger.info(f"Range: {ranking_window[0]} - {ranking_window[1]}")
+            logger.info(f"Filtered to {len(filtered_indices)} departments")
         
         # HARD RESET: Ranking filtreleme sonrası
         logger.info("Ranking filtering completed - hard reset")
         
         return filtered_indices
     
-    def compute_semantic_similarity(self, interests: str, candidate_indices: list):
+    def table_scores(self, interests: str):
+        """Kategori tablosundan açıklama skorları; tablo kapalıysa veya sorguyu karşılamıyorsa None"""
+        if self.category_table is None:
+            return None
+        scores = self.category_table.scores(interests, compose=self.category_table_mode == 'compose')
+        record_cache('category_table', scores is not None)
+        return scores
+    
+    def table_vector(self, interests: str):
+        if self.category_table is None:
+            return None
+        vector = self.category_table.query_vector(interests, compose=self.category_table_mode == 'compose')
+        record_cache('category_table', vector is not None)
+        return vector
+    
+    def lookup_query_embedding(self, key: str):
+        embedding = self.query_cache.get(key)
+        record_cache('query_embedding', embedding is not None)
+        return embedding
+    
+    def encode_query(self, interests: str, use_table: bool = True):
+        """İlgi alanı metninin normalize embedding'i; önce kategori tablosuna, sonra paylaşılan LRU cache'e bakılır"""
+        embedding = self.table_vector(interests) if use_table else None
+        if embedding is not None:
+            return embedding
+        key = normalize_interests(interests)
+        embedding = self.lookup_query_embedding(key)
+        if embedding is None:
+            with timed('encode'):
+                if self.batch_encoder is not None:
+                    embedding = self.batch_encoder.encode(key)
+                else:
+                    record_encoder_batch('direct', 1)
+                    embedding = self.model.encode([key], normalize_embeddings=True)[0]
+            embedding = self.query_cache.put(key, embedding)
+        return embedding
+    
+    def encode_queries(self, interests_list, use_table: bool = True):
+        """Birden çok ilgi alanı metnini tek model.encode çağrısıyla encode eder (satır sırası korunur)"""
+        keys = [normalize_interests(interests) for interests in interests_list]
+        embeddings = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            embedding = self.table_vector(key) if use_table else None
+            if embedding is None:
+                embedding = self.lookup_query_embedding(key)
+            if embedding is None:
+                missing.append(key)
+            else:
+                embeddings[key] = embedding
+        
+        if missing:
+            record_encoder_batch('bulk', len(missing))
+            with timed('encode'):
+                encoded = self.model.encode(missing, batch_size=len(missing), normalize_embeddings=True, show_progress_bar=False)
+            for key, embedding in zip(missing, encoded):
+                embeddings[key] = self.query_cache.put(key, embedding)
+        
+        dimension = self.department_embeddings.shape[1]
+        return np.stack([embeddings[key] for key in keys]) if keys else np.empty((0, dimension), dtype=np.float32)
+    
+    def prewarm_query_cache(self, max_combination: int = 2):
+        """Tek ve ikili kategori kombinasyonlarını önceden encode eder"""
+        added = self.query_cache.prewarm(self.model, self.rules.interest_categories, max_combination)
+        logger.info(f"Query cache prewarmed with {added} new entries")
+        return added
+    
+    def compute_semantic_similarity(self, interests: str, candidate_indices, interest_embedding=None,
+                                    description_scores=None):
+        """Aday satırlar için benzerlik skorları (candidate_indices ile hizalı float32 dizi)"""
         if not interests.strip():
-            return []
-            
-        interest_embedding = self.model.encode([interests])
-        candidate_embeddings = self.department_embeddings[candidate_indices]
-        similarities = cosine_similarity(interest_embedding, candidate_embeddings)[0]
+            return np.zeros(len(candidate_indices), dtype=np.float32)
+        
+        table_checked = description_scores is None and interest_embedding is None
+        if table_checked:
+            # Kategori tablosu karşılıyorsa encoder ve matvec atlanır
+            description_scores = self.table_scores(interests)
+        
+        if description_scores is not None:
+            # Toplu skorlamada Q x E^T satırı (veya tablo satırı) önceden hesaplanmıştır; sadece adaylar toplanır
+            return description_scores[self.description_index[candidate_indices]]
         
-        results = []
-        for i, idx in enumerate(candidate_indices):
-            results.append({
-                'index': idx,
-                'similarity_score': similarities[i]
-            })
+        if interest_embedding is None:
+            interest_embedding = self.encode_query(interests, use_table=not table_checked)
+        description_ids = self.description_index[candidate_indices]
+        
+        if len(candidate_indices) >= len(self.department_embeddings):
+            # Benzersiz açıklama matrisinin tamamı tek matvec ile skorlanır, satır kopyalanmaz
+            similarities = (self.department_embeddings @ interest_embedding)[description_ids]
+        else:
+            similarities = self.department_embeddings[description_ids] @ interest_embedding
         
         # HARD RESET: Similarity hesaplama sonrası
         logger.info("Similarity computation completed - hard reset")
         
-        return results
-    
-    def boost_keyword_matches(self, interests: str, results: list):
-        """Geliştirilmiş keyword boost - pozitif ifadeler ekstra boost alır"""
-        interests_lower = interests.lower()
-        
-        # Expanded mappings - düzeltilmiş versiyon
-        expanded_mappings = {
-            'teknoloji': ['bilgisayar', 'yazılım', 'programlama', 'web', 'oyun', 'dijital', 'sistem', 'kodlama', 'algoritma', 'veri', 'yapay zeka', 'robotik'],
-            'sağlık': ['sağlık', 'tıp', 'hemşire', 'hasta', 'tedavi', 'anestezi', 'veteriner', 'diş', 'fizyoterapi', 'biyoloji', 'eczacılık', 'laboratuvar'],
-            'sanat': ['sanat', 'tasarım', 'grafik', 'müzik', 'sinema', 'fotoğraf', 'görsel', 'yaratıcı', 'moda', 'animasyon', 'illüstrasyon', 'estetik'],
-            'spor': ['spor', 'antrenör', 'fitness', 'egzersiz', 'rekreasyon', 'beden', 'atletik', 'kondisyon', 'performans', 'müsabaka', 'takım', 'saha'],
-            'işletme': ['işletme', 'pazarlama', 'muhasebe', 'ticaret', 'yönetim', 'ekonomi', 'finans', 'satış', 'girişimcilik', 'lojistik', 'insan kaynakları', 'strateji'],
-            'gastronomi': ['gastronomi', 'mutfak', 'yemek', 'aşçılık', 'pasta', 'şef', 'fırıncılık', 'gıda', 'restoran', 'menü', 'lezzet', 'sunum'],
-            'eğitim': ['öğretmen', 'eğitim', 'öğretim', 'ders', 'okul', 'çocuk', 'akademik', 'öğrenci', 'pedagoji', 'psikoloji', 'rehberlik', 'müfredat'],
-            'mühendislik': ['mühendislik', 'mühendis', 'teknik', 'endüstri', 'makina', 'elektrik', 'inşaat', 'çevre', 'proje', 'tasarım', 'analiz', 'yapı'],
-            'hukuk': ['hukuk', 'avukat', 'mahkeme', 'dava', 'kanun', 'yasa', 'adalet', 'hâkim', 'savcı', 'anayasa', 'ceza', 'medeni'],
-            'finans': ['finans', 'banka', 'borsa', 'yatırım', 'kredi', 'sigorta', 'muhasebe', 'vergi', 'ekonomi', 'para', 'döviz', 'risk'],
-            'medya': ['medya', 'gazete', 'televizyon', 'radyo', 'haber', 'basın', 'yayın', 'sosyal medya', 'reklam', 'pazarlama', 'içerik', 'editör'],
-            'turizm': ['turizm', 'otel', 'seyahat', 'rehber', 'konaklama', 'resepsiyon', 'acenta', 'rezervasyon', 'müze', 'kültür', 'tatil', 'gezi']
-        }
+        return similarities
+    
+    def retrieve_candidates(self, candidate_indices, interest_embedding, keep=None, depth: int = None):
+        """
+        Vektör indeksinden, adayların açıklamalarıyla maskelenmiş en yakın `depth` (varsayılan search_depth)
+        açıklamayı alır. `keep` (candidate_indices ile hizalı bool dizi) ile işaretli adaylar her durumda kalır.
+        Dönen değer candidate_indices ile hizalı seçim maskesidir.
+        """
+        description_ids = self.description_index[candidate_indices]
+        mask = np.zeros(len(self.department_embeddings), dtype=bool)
+        mask[description_ids] = True
+        
+        nearest, _ = self.vector_index.search(interest_embedding, depth or self.search_depth, mask)
+        mask[:] = False
+        mask[nearest] = True
+        selected = mask[description_ids]
+        if keep is not None:
+            selected |= keep
+        logger.info(f"Vector index ({self.vector_index.name}): {len(candidate_indices)} -> {int(selected.sum())} departments")
+        return selected
+    
+    def build_keyword_index(self):
+        """Benzersiz (bolum_adi + Aciklama) metinleri için department x keyword matrisi"""
+        names = self.store.strings['bolum_adi']
+        descriptions = self.store.strings['Aciklama']
+        # Metin, depodaki iki string kodunun çiftiyle belirlenir; her çift bir kez çözülür
+        pair_codes = names.codes.astype(np.int64) * descriptions.unique_count + descriptions.codes
+        codes, unique_pairs = pd.factorize(pair_codes)
+        self.text_index = codes.astype(np.int32)
+        unique_texts = [
+            f"{names.value(pair // descriptions.unique_count)} {descriptions.value(pair % descriptions.unique_count)}".lower()
+            for pair in unique_pairs
+        ]
+        self.keyword_matrix = self.rules.build_keyword_matrix(unique_texts)
+        logger.info(f"Keyword matrix: {self.keyword_matrix.shape[0]} texts x {self.keyword_matrix.shape[1]} keywords")
+    
+    def boost_keyword_matches(self, interests: str, candidate_indices, positive_boost_categories=None):
+        """Geliştirilmiş keyword boost - pozitif ifadeler ekstra boost alır (candidate_indices ile hizalı)"""
+        if positive_boost_categories is None:
+            positive_boost_categories = getattr(self, 'positive_boost_categories', ())
         
-        all_keywords = set()
-        for word in interests_lower.split(','):
-            word = word.strip()
-            for category, expanded_keywords in expanded_mappings.items():
-                # DÜZELTME: [:3] kaldırıldı - tüm keyword'leri kontrol et
-                if word in expanded_keywords:
-                    all_keywords.update(expanded_keywords)
-                    break
-        
-        for result in results:
-            idx = result['index']
-            dept_row = self.departments_df.iloc[idx]
-            dept_text = (dept_row['bolum_adi'] + ' ' + dept_row['Aciklama']).lower()
-            
-            keyword_boost = 0
-            for keyword in all_keywords:
-                if keyword in dept_text:
-                    # ARTTIRILMIŞ BOOST: 0.1'den 0.3'e çıkarıldı
-                    base_boost = 0.3
-                    
-                    # Pozitif ifadeler ekstra boost alır
-                    if hasattr(self, 'positive_boost_categories'):
-                        for boost_category in self.positive_boost_categories:
-                            if keyword in expanded_mappings.get(boost_category, []):
-                                base_boost += 0.2  # Ekstra pozitif boost
-                                break
-                    
-                    keyword_boost += base_boost
-                    
-            result['similarity_score'] += keyword_boost
-            result['keyword_boost'] = keyword_boost
+        # Boost = keyword eşleşme matrisi x ağırlık vektörü, sadece aday metinler için
+        weights = self.rules.keyword_weights(interests, positive_boost_categories)
+        text_boosts = (self.keyword_matrix @ weights).astype(np.float32)
+        boosts = text_boosts[self.text_index[candidate_indices]]
         
         # HARD RESET: Keyword boost sonrası
         logger.info("Keyword boosting completed - hard reset")
         
-        return results
+        return boosts
+    
+    def build_negative_index(self):
+        """Benzersiz bölüm adları için negatif kategori üyelik matrisi"""
+        names = self.store.strings['bolum_adi']
+        self.name_index = names.codes
+        self.negative_membership = self.rules.build_negative_membership([name.lower() for name in names.values()])
     
-    def filter_negative_departments(self, candidate_indices: list, user_input: str):
+    def filter_negative_departments(self, candidate_indices, user_input: str):
         """Department'ları negatif keyword'lere göre filtrele - similarity hesaplamadan önce"""
-        user_lower = user_input.lower()
-        
-        negative_categories = {
-            'sağlık': ['tıp', 'tip', 'sağlık', 'hemşire', 'diş', 'veteriner', 'eczacı'],
-            'mühendislik': ['mühendislik', 'mühendis'],
-            'teknoloji': ['teknoloji', 'bilgisayar', 'yazılım'],
-            'hukuk': ['hukuk', 'avukat'],
-            'matematik': ['matematik', 'hesap'],
-            'spor': ['spor', 'fitness'],
-            'işletme': ['işletme', 'pazarlama'],
-            'eğitim': ['öğretmen', 'eğitim'],
-            'finans': ['finans', 'banka']
-        }
-        
-        negative_words = ['istemiyorum', 'sevmiyorum', 'sevmem', 'olmasın']
+        candidate_indices = np.asarray(candidate_indices)
         
-        filtered_indices = []
-        excluded_count = 0
-        
-        for idx in candidate_indices:
-            dept_name = self.departments_df.iloc[idx]['bolum_adi'].lower()
-            should_exclude = False
-            
-            for category, keywords in negative_categories.items():
-                for keyword in keywords:
-                    for neg_word in negative_words:
-                        pattern1 = f"{keyword} {neg_word}"
-                        pattern2 = f"{neg_word} {keyword}"
-                        
-                        if (pattern1 in user_lower or pattern2 in user_lower):
-                            # Bu kategoriyi exclude et
-                            if any(kw in dept_name for kw in keywords):
-                                should_exclude = True
-                                excluded_count += 1
-                                logger.info(f"EXCLUDED: {self.departments_df.iloc[idx]['bolum_adi']} - {category} filtrelendi")
-                                break
-                    if should_exclude:
-                        break
-                if should_exclude:
-                    break
-            
-            if not should_exclude:
-                filtered_indices.append(idx)
-        
-        logger.info(f"Negative filtering: {len(candidate_indices)} -> {len(filtered_indices)} departments ({excluded_count} excluded)")
+        # İstenmeyen kategoriler sorgu başına bir kez çözülür
+        return self.exclude_negated(candidate_indices, self.rules.negated_categories(user_input))
+    
+    def exclude_negated(self, candidate_indices, negated):
+        """Negatif kategori üyelik maskesiyle adayları tek NumPy işleminde eler"""
+        if not negated:
+            return candidate_indices
+        
+        excluded_names = self.negative_membership[:, negated].any(axis=1)
+        excluded = excluded_names[self.name_index[candidate_indices]]
+        filtered_indices = candidate_indices[~excluded]
+        
+        excluded_count = len(candidate_indices) - len(filtered_indices)
+        negated_names = [self.rules.negative_category_names[column] for column in negated]
+        logger.info(f"Negative filtering ({', '.join(negated_names)}): {len(candidate_indices)} -> {len(filtered_indices)} departments ({excluded_count} excluded)")
         return filtered_indices
     
-    def recommend(self, user_input: str, top_k: int = 10, tolerance_percent: float = 0.20):
+    def parse_query(self, user_input: str, tolerance_percent: float = 0.20, filters=None):
+        """Ham metni (ve yapısal filtreleri) skorlamayı belirleyen alanlara indirger"""
+        if not isinstance(filters, DepartmentFilters):
+            filters = parse_filters(filters)
+        interests, positive_boost, _ = self.rules.extract(user_input)
+        ranking = self.rules.extract_ranking(user_input)
+        
+        return RecommendationQuery(
+            interests=normalize_interests(', '.join(interests)),
+            ranking_window=self.ranking_window(ranking, tolerance_percent),
+            negated_categories=tuple(self.rules.negated_categories(user_input)),
+            positive_boost_categories=tuple(sorted(positive_boost)),
+            filters=filters
+        )
+    
+    def lookup_response(self, cache_key):
+        recommendations = self.response_cache.get(cache_key)
+        record_cache('response', recommendations is not None)
+        return recommendations
+    
+    def recommend(self, user_input: str, top_k: int = 10, tolerance_percent: float = 0.20, filters=None):
         logger.info(f"Processing recommendation for: {user_input}")
         
-        interests, ranking = self.extract_interests_and_ranking(user_input)
-        logger.info(f"Extracted interests: '{interests}', ranking: {ranking}")
+        with timed('extract'):
+            query = self.parse_query(user_input, tolerance_percent, filters)
+        logger.info(f"Parsed query: {query}")
         
-        candidate_indices = self.filter_by_ranking(ranking, tolerance_percent)
+        # Cache hit'te skorlama koduna hiç girilmez
+        cache_key = (query, top_k)
+        recommendations = self.lookup_response(cache_key)
+        if recommendations is None:
+            recommendations = self.recommend_query(query, top_k)
+            self.response_cache.put(cache_key, recommendations)
         
-        if not candidate_indices:
+        return [dict(recommendation) for recommendation in recommendations]
+    
+    def iter_recommend_many(self, user_inputs, top_k: int = 10, tolerance_percent: float = 0.20, chunk_size: int = 256,
+                            filters=None):
+        """
+        Toplu öneri: her chunk'taki ilgi alanları tek batch'te encode edilir ve benzersiz açıklama
+        matrisine karşı tek matris-matris çarpımıyla skorlanır. Sonuçlar girdi sırasıyla üretilir
+        (generator - büyük listeler NDJSON olarak akıtılabilir).
+        """
+        user_inputs = list(user_inputs)
+        # Filtreler tüm girdiler için ortaktır, bir kez doğrulanır
+        filters = parse_filters(filters) if not isinstance(filters, DepartmentFilters) else filters
+        for start in range(0, len(user_inputs), chunk_size):
+            chunk = user_inputs[start:start + chunk_size]
+            with timed('extract'):
+                queries = [self.parse_query(user_input, tolerance_percent, filters) for user_input in chunk]
+            results = [self.lookup_response((query, top_k)) for query in queries]
+            
+            pending = [i for i, result in enumerate(results) if result is None]
+            interests = list(dict.fromkeys(queries[i].interests for i in pending if queries[i].interests.strip()))
+            score_rows = {}
+            if self.vector_index.exact:
+                # Kategori tablosunun karşıladığı ilgi alanları GEMM'e girmez
+                for interest in interests:
+                    row = self.table_scores(interest)
+                    if row is not None:
+                        score_rows[interest] = row
+            remaining = [interest for interest in interests if interest not in score_rows]
+            
+            # Tam indekste tablo yukarıda zaten sorulmuştur
+            query_embeddings = dict(zip(remaining, self.encode_queries(remaining, use_table=not self.vector_index.exact))) if remaining else {}
+            if query_embeddings and self.vector_index.exact:
+                # (sorgu sayısı x benzersiz açıklama) skor matrisi - tek GEMM
+                with timed('batch_similarity'):
+                    score_matrix = (self.department_embeddings @ np.stack(list(query_embeddings.values())).T).T
+                score_rows.update(zip(remaining, score_matrix))
+            
+            # Aynı chunk'ta tekrarlanan sorgular bir kez skorlanır
+            computed = {}
+            for i in pending:
+                query = queries[i]
+                recommendations = computed.get(query)
+                if recommendations is None:
+                    recommendations = self.recommend_query(
+                        query, top_k, query_embeddings.get(query.interests), score_rows.get(query.interests)
+                    )
+                    self.response_cache.put((query, top_k), recommendations)
+                    computed[query] = recommendations
+                results[i] = recommendations
+            
+            logger.info(f"Batch chunk {start}-{start + len(chunk)}: {len(computed)} scored, {len(interests)} unique interest sets, "
+                        f"{len(interests) - len(remaining)} from category table")
+            for recommendations in results:
+                yield [dict(recommendation) for recommendation in recommendations]
+    
+    def recommend_many(self, user_inputs, top_k: int = 10, tolerance_percent: float = 0.20, chunk_size: int = 256,
+                       filters=None):
+        """iter_recommend_many'nin liste dönen hali - girdi sırasıyla öneri listeleri"""
+        return list(self.iter_recommend_many(user_inputs, top_k, tolerance_percent, chunk_size, filters))
+    
+    def recommend_query(self, query: RecommendationQuery, top_k: int = 10, interest_embedding=None,
+                        description_scores=None):
+        """Parse edilmiş sorgu için skorlama ve top_k seçimi"""
+        # Her aşamanın süresi ve sonrasında kalan aday sayısı metriklere yazılır (bkz. metrics.py)
+        with timed('ranking_filter'):
+            candidate_indices = self.candidates_in_window(query.ranking_window)
+        record_candidates('ranking_filter', len(candidate_indices))
+        logger.info(f"Ranking window {query.ranking_window}: {len(candidate_indices)} departments")
+        
+        # Yapısal filtreler benzerlik hesabından önce, posting list'lerin pencereyle kesişimiyle uygulanır
+        if query.filters:
+            with timed('filters'):
+                candidate_indices = self.filter_index.candidates(candidate_indices, query.ranking_window, query.filters)
+            record_candidates('filters', len(candidate_indices))
+            logger.info(f"Filters {query.filters}: {len(candidate_indices)} departments")
+        
+        if len(candidate_indices) == 0:
             return []
         
         # 1. ÖNCE NEGATİF FİLTRELEME YAP (similarity hesaplamadan önce)
-        candidate_indices = self.filter_negative_departments(candidate_indices, user_input)
+        if query.negated_categories:
+            with timed('negative_filter'):
+                candidate_indices = self.exclude_negated(candidate_indices, list(query.negated_categories))
+            record_candidates('negative_filter', len(candidate_indices))
         
-        if not candidate_indices:
+        if len(candidate_indices) == 0:
             logger.info("No departments left after negative filtering")
             return []
         
-        # 2. Sonra similarity hesapla
-        results = self.compute_semantic_similarity(interests, candidate_indices)
-        results = self.boost_keyword_matches(interests, results)
+        boosts = None
+        # Yaklaşık indekste sadece sorguya en yakın açıklamaları taşıyan adaylar skorlanır
+        if not self.vector_index.exact and query.interests.strip():
+            if interest_embedding is None:
+                interest_embedding = self.encode_query(query.interests)
+            # Boost tüm adaylar için bir kez hesaplanır; seçilen adaylarınki aynı diziden alınır
+            with timed('boost'):
+                boosts = self.boost_keyword_matches(query.interests, candidate_indices, query.positive_boost_categories)
+            with timed('retrieve'):
+                # Keyword boost'u olan adaylar (boost 0.3-0.5, benzerlik ~0.1-0.5) benzerlikten bağımsız kazanabilir;
+                # indeks sadece boost'suz adaylar için kullanılır. Derinlik >= top_k iken indeksin recall'u tamsa
+                # sonuç exact ile aynıdır: dışarıda kalan boost'suz bir satırı en az top_k aday geçer.
+                selected = self.retrieve_candidates(
+                    candidate_indices, interest_embedding, keep=boosts > 0, depth=max(self.search_depth, top_k)
+                )
+                candidate_indices = candidate_indices[selected]
+                boosts = boosts[selected]
+            record_candidates('retrieve', len(candidate_indices))
+        
+        # 2. Sonra similarity hesapla - skorlar baştan sona float32 dizi olarak kalır
+        # (cache miss'te 'similarity' süresi içindeki encoder çağrısı ayrıca 'encode' olarak da görünür)
+        with timed('similarity'):
+            similarities = self.compute_semantic_similarity(
+                query.interests, candidate_indices, interest_embedding, description_scores
+            )
+        with timed('boost'):
+            if boosts is None:
+                boosts = self.boost_keyword_matches(query.interests, candidate_indices, query.positive_boost_categories)
+            scores = similarities + boosts
+        
+        # 3. Sadece en iyi top_k seçilir (argpartition), dict'ler yalnızca bunlar için kurulur
+        with timed('top_k'):
+            top_positions = select_top_k(scores, candidate_indices, top_k)
+        
+        # 4. Prepare final recommendations
+        # Satırlar kolon dizilerinden okunur (iloc / pandas Series kurulmaz)
+        with timed('format'):
+            recommendations = self.format_recommendations(candidate_indices, top_positions, scores, boosts)
         
-        # 3. Sort by score
-        results.sort(key=lambda x: x['similarity_score'], reverse=True)
-        
-        # 4. Sadece en iyi sonuçları al (diversification kaldırıldı)
-        results = results[:top_k]
+        logger.info(f"Generated {len(recommendations)} recommendations")
+        logger.info("Recommendation process completed - FULL HARD RESET")
         
-        # 5. Prepare final recommendations
+        return recommendations
+    
+    def format_recommendations(self, candidate_indices, top_positions, scores, boosts):
+        store = self.store
         recommendations = []
-        for result in results:
-            idx = result['index']
-            dept_row = self.departments_df.iloc[idx]
+        for position in top_positions:
+            idx = candidate_indices[position]
+            score = float(scores[position])
             
             # Similarity score'u yüzde olarak hesapla
-            similarity_percentage = min(100, int(result['similarity_score'] * 100))
+            similarity_percentage = min(100, int(score * 100))
             
             recommendation = {
-                'bolum_adi': dept_row['bolum_adi'],
-                'universite': dept_row['Universite'],
-                'sehir': dept_row['Sehir'],
-                'ranking_2025': int(dept_row['ranking_2025']),
+                'bolum_adi': store['bolum_adi'][idx],
+                'universite': store['Universite'][idx],
+                'sehir': store['Sehir'][idx],
+                'ranking_2025': int(store['ranking_2025'][idx]),
                 'taban_puan': None,
-                'similarity_score': round(result['similarity_score'], 4),
+                'similarity_score': round(score, 4),
                 'similarity_percentage': f"{similarity_percentage}%",
-                'keyword_boost': round(result.get('keyword_boost', 0), 4),
-                'description_preview': dept_row['Aciklama'][:150] + '...'
+                'keyword_boost': round(float(boosts[position]), 4),
+                'description_preview': store['Aciklama'][idx][:150] + '...'
             }
             recommendations.append(recommendation)
-        
-        logger.info(f"Generated {len(recommendations)} recommendations")
-        logger.info("Recommendation process completed - FULL HARD RESET")
-        
         return recommendations
 
-def main():
-    dataset_path = "./Backend/Data/2yillik_Bolumler_aciklamali_yeni.csv"
-    engine = HybridRecommendationEngine(dataset_path)
-    
-    test_cases = [
-        "sanat ve tasarım çok seviyorum 120 bin sıralama",
-        "mühendislik istiyorum tıp istemiyorum 50 bin",
-        "hukuk okumak istiyorum avukat olmak istiyorum 20 bin"
-    ]
-    
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"TEST {i}: {test_case}")
-        print('='*80)
-        
-        recommendations = engine.recommend(test_case, top_k=6)
-        
-        for j, rec in enumerate(recommendations, 1):
-            print(f"{j}. {rec['bolum_adi']} - {rec['universite']}")
-            print(f"   Sıralama: {rec['ranking_2025']}")
-            print(f"   Uyum: {rec['similarity_percentage']} ({rec['similarity_score']:.4f})")
+def main(argv=None):
+    """Komut satırı: prompt dosyasını toplu skorlar (bkz. offline_scoring.py)"""
+    from offline_scoring import main as offline_main
+    return offline_main(argv)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
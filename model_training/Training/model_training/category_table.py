@@ -0,0 +1,173 @@
+# Kategori x bölüm benzerlik tablosu
+# extract_career_interests sadece sabit bir kategori sözlüğünden ('genel' dahil) etiket üretir; encoder'a giden
+# sorgu metni bu etiketlerin virgülle birleşimidir. Tablo her kategori için normalize embedding'i ve tüm
+# benzersiz açıklamalarla benzerliğini tutar; böylece sorgu skorları transformer çağrılmadan okunur.
+#
+# Eşdeğerlik:
+#   - Tek kategori: tablo satırı, encode_query(etiket) ile aynı metnin embedding'i ve aynı matvec'tir; fark yalnızca
+#     batch içinde encode etmenin float gürültüsüdür (~1e-6, sorgu cache'i ön ısıtmasıyla aynı durum).
+#   - Çok kategori ("compose" modu): sorgu vektörü kategori vektörlerinin normalize toplamı olarak alınır,
+#       skor = sum_i S[c_i] / ||sum_i v_i||,  ||sum_i v_i||^2 = sum_ij G[c_i, c_j]  (G = kategori Gram matrisi)
+#     Bu, birleşik metnin ("sağlık, teknoloji") encode edilmesine yaklaşıktır; sapma kosinüs olarak
+#     `python category_table.py --dataset ... --measure` ile ölçülür ve tablo meta verisine yazılır.
+import os
+import json
+import logging
+import itertools
+
+import numpy as np
+
+from embedding_cache import atomic_write, content_hash
+from query_cache import normalize_interests
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMAT_VERSION = 1
+CATEGORY_TABLE_MODES = ('single', 'compose')
+
+
+def table_path(dataset_path: str):
+    return os.path.splitext(dataset_path)[0] + '.category_table.npz'
+
+
+def table_key(model_name: str, embedding_dtype: str, categories, descriptions):
+    """Model, açıklama matrisi tipi, kategori listesi ve açıklamalardan türetilen anahtar"""
+    header = f"{model_name}\0{embedding_dtype}\0category-table-v{TABLE_FORMAT_VERSION}\0{len(categories)}"
+    return content_hash(header, list(categories) + list(descriptions))
+
+
+class CategorySimilarityTable:
+    def __init__(self, categories, vectors, similarities, key: str, meta: dict = None):
+        self.categories = list(categories)
+        self.vectors = vectors
+        self.similarities = similarities
+        self.gram = vectors @ vectors.T
+        self.key = key
+        self.meta = meta or {}
+        self._rows = {category: row for row, category in enumerate(self.categories)}
+
+    @classmethod
+    def build(cls, model, categories, department_embeddings, key: str):
+        """Kategori etiketlerini sorgu ile aynı biçimde encode eder ve açıklama skorlarını hesaplar"""
+        labels = [normalize_interests(category) for category in categories]
+        vectors = np.asarray(model.encode(labels, normalize_embeddings=True, show_progress_bar=False), dtype=np.float32)
+        # Satır satır matvec: compute_semantic_similarity ile aynı işlem (matris çarpımındaki farklı toplama sırası olmaz)
+        similarities = np.stack([np.asarray(department_embeddings @ vector, dtype=np.float32) for vector in vectors])
+        return cls(labels, vectors, similarities, key)
+
+    def rows_for(self, interests: str):
+        """İlgi alanı metnindeki kategorilerin tablo satırları; tabloda olmayan varsa None"""
+        key = normalize_interests(interests)
+        if not key:
+            return None
+        rows = [self._rows.get(category) for category in key.split(', ')]
+        return None if any(row is None for row in rows) else rows
+
+    def scores(self, interests: str, compose: bool = False):
+        """Açıklama skorları (benzersiz açıklama sırasıyla); tablo karşılayamıyorsa None"""
+        rows = self.rows_for(interests)
+        if rows is None or (len(rows) > 1 and not compose):
+            return None
+        if len(rows) == 1:
+            return self.similarities[rows[0]]
+        norm = np.sqrt(self.gram[np.ix_(rows, rows)].sum())
+        return self.similarities[rows].sum(axis=0) / norm
+
+    def query_vector(self, interests: str, compose: bool = False):
+        """Sorgu embedding'i (tek kategoride birebir, çokta normalize toplam); karşılanamıyorsa None"""
+        rows = self.rows_for(interests)
+        if rows is None or (len(rows) > 1 and not compose):
+            return None
+        if len(rows) == 1:
+            return self.vectors[rows[0]]
+        composed = self.vectors[rows].sum(axis=0)
+        return composed / np.linalg.norm(composed)
+
+    def measure_composition(self, model, max_combination: int = 3):
+        """Bileşik vektörün, birleşik metnin gerçek embedding'ine kosinüs benzerliği (kombinasyon boyu başına)"""
+        report = {}
+        for size in range(2, max_combination + 1):
+            keys = [', '.join(combination) for combination in itertools.combinations(sorted(self.categories), size)]
+            encoded = np.asarray(model.encode(keys, batch_size=64, normalize_embeddings=True, show_progress_bar=False),
+                                 dtype=np.float32)
+            composed = np.stack([self.query_vector(key, compose=True) for key in keys])
+            cosines = np.sum(encoded * composed, axis=1)
+            report[str(size)] = {
+                'combinations': len(keys),
+                'min_cosine': round(float(cosines.min()), 5),
+                'mean_cosine': round(float(cosines.mean()), 5)
+            }
+        self.meta['composition'] = report
+        return report
+
+    def save(self, path: str):
+        meta = dict(self.meta, key=self.key, categories=self.categories)
+        try:
+            atomic_write(path, lambda f: np.savez(
+                f, vectors=self.vectors, similarities=self.similarities, meta=np.array(json.dumps(meta, ensure_ascii=False))
+            ))
+        except OSError as e:
+            logger.warning(f"Could not write category table {path}: {e}")
+            return False
+        return True
+
+    @classmethod
+    def load(cls, path: str, key: str):
+        """Anahtar eşleşirse tabloyu yükler, aksi halde None"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('key') != key:
+                    logger.info(f"Category table is stale: {path}")
+                    return None
+                return cls(meta.pop('categories'), data['vectors'], data['similarities'], meta.pop('key'), meta)
+        except (OSError, ValueError, KeyError):
+            logger.warning(f"Unreadable category table: {path}")
+            return None
+
+
+def load_or_build(model, model_name: str, embedding_dtype: str, categories, descriptions, department_embeddings,
+                  dataset_path: str, rebuild: bool = False, persist: bool = True):
+    """Diskteki tabloyu kullanır; yoksa (veya eskiyse) kurar ve yazar. persist=False: sadece bellekte kurar"""
+    key = table_key(model_name, embedding_dtype, [normalize_interests(category) for category in categories], descriptions)
+    path = table_path(dataset_path)
+    table = None if rebuild or not persist else CategorySimilarityTable.load(path, key)
+    if table is not None:
+        logger.info(f"Loaded category table for {dataset_path}")
+        return table
+
+    table = CategorySimilarityTable.build(model, categories, department_embeddings, key)
+    if persist:
+        table.save(path)
+    return table
+
+
+def main(argv=None):
+    import argparse
+    from Similarity_Prompt import HybridRecommendationEngine
+
+    parser = argparse.ArgumentParser(description='Kategori x bölüm benzerlik tablosunu offline kurar')
+    parser.add_argument('--dataset', required=True)
+    parser.add_argument('--measure', action='store_true', help='Çok kategorili bileşim sapmasını ölçüp tabloya yazar')
+    parser.add_argument('--max-combination', type=int, default=3)
+    parser.add_argument('--embedding-dtype', default='float32', help='Tabloyu kullanacak engine ile aynı olmalı')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('Similarity_Prompt').setLevel(logging.WARNING)
+    engine = HybridRecommendationEngine(args.dataset, embedding_dtype=args.embedding_dtype)
+    table = load_or_build(engine.model, engine.encoder_key, engine.embedding_dtype, engine.rules.interest_categories,
+                          engine.unique_descriptions, engine.department_embeddings, engine.cache_dataset_path,
+                          rebuild=True)
+    if args.measure:
+        for size, stats in table.measure_composition(engine.model, args.max_combination).items():
+            print(f"{size} categories: {stats['combinations']} combinations, "
+                  f"min cosine {stats['min_cosine']}, mean {stats['mean_cosine']}")
+        table.save(table_path(engine.cache_dataset_path))
+    print(f"{len(table.categories)} categories x {table.similarities.shape[1]} descriptions -> "
+          f"{table_path(engine.cache_dataset_path)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# Vektörize CSV yükleyici
+# YÖK tablolarındaki Türkçe sayı formatlarını ("340.300" binlik nokta, "306,6972" ondalık virgül)
+# pandas string işlemleriyle tipli kolonlara çevirir ve reddedilen satırları sebebiyle raporlar.
+import logging
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Eksik tam sayı değerleri için kullanılan değer (int32 kolonlarda NaN tutulamaz)
+MISSING_INT = -1
+
+# Sıralama kolonunda sayı yerine yazılan durum ifadeleri
+RANKING_STATUS_WORDS = ('Dolmadı', 'Yer.Olmadı', 'Yeni')
+
+REQUIRED_TEXT_COLUMNS = ['Aciklama', 'bolum_adi']
+
+# PDF dönüşümünden "u\nÖrgün", "w\nUluslararası Balkan Ü." gibi tek harfli önekle gelen kolonlar
+CATEGORY_COLUMNS = ['Sehir', 'Universite', 'Tur', 'Ogrenim_sekli']
+
+# Ücret kolonunda '-' ücret alınmadığını, 'Bak' (bakınız) değerin tabloda olmadığını belirtir
+NO_FEE = '-'
+
+
+def parse_turkish_int(series: pd.Series):
+    """'340.300' -> 340300; virgül içeren veya sayısal olmayan değerler geçersiz sayılır"""
+    text = series.str.strip()
+    digits = text.str.replace('.', '', regex=False)
+    valid = digits.str.fullmatch(r'\d+').fillna(False).astype(bool)
+    valid &= ~text.str.contains(',', regex=False).fillna(False).astype(bool)
+    values = pd.to_numeric(digits.where(valid), errors='coerce')
+    return values, valid
+
+
+def parse_turkish_float(series: pd.Series):
+    """'306,6972' -> 306.6972; sayısal olmayan değerler NaN olur"""
+    text = series.str.strip()
+    valid = text.str.fullmatch(r'\d+(?:,\d+)?').fillna(False).astype(bool)
+    values = pd.to_numeric(text.where(valid).str.replace(',', '.', regex=False), errors='coerce')
+    return values, valid
+
+
+def strip_pdf_prefix(series: pd.Series):
+    """'u\nÖrgün' -> 'Örgün': hücredeki son satır asıl değerdir"""
+    return series.str.split('\n').str[-1].str.strip()
+
+
+def parse_fee(series: pd.Series):
+    """'₺187.425' -> 187425, '-' -> 0 (ücretsiz), 'Bak' ve diğerleri -> MISSING_INT"""
+    text = strip_pdf_prefix(series)
+    values, valid = parse_turkish_int(text.str.lstrip('₺'))
+    fees = _int32_column(values, valid & text.str.startswith('₺').fillna(False).astype(bool))
+    fees[(text == NO_FEE).fillna(False).to_numpy()] = 0
+    return fees
+
+
+def _int32_column(values: pd.Series, valid: pd.Series):
+    return np.where(valid.to_numpy(), values.fillna(MISSING_INT).to_numpy(), MISSING_INT).astype(np.int32)
+
+
+def _ranking_reject_reason(value):
+    if pd.isna(value) or value.strip() == '':
+        return 'missing_ranking'
+    if ',' in value:
+        return 'comma_in_ranking'
+    # PDF'ten gelen "a\nDolmadı" gibi önekler son satıra bakılarak sınıflandırılır
+    last_line = value.strip().split('\n')[-1]
+    if last_line in RANKING_STATUS_WORDS:
+        return f'status:{last_line}'
+    return 'unparseable_ranking'
+
+
+def load_departments(dataset_path: str):
+    """CSV'yi okur, tipli kolonları ekler; (DataFrame, rapor) döner"""
+    df = pd.read_csv(dataset_path, dtype=str)
+    total_rows = len(df)
+    rejected = Counter()
+
+    text_ok = df[REQUIRED_TEXT_COLUMNS].notna().all(axis=1)
+    rejected['missing_text'] = int((~text_ok).sum())
+    df = df[text_ok]
+
+    rankings, ranking_ok = parse_turkish_int(df['2025_Taban_Sıralama'])
+    for value in df.loc[~ranking_ok, '2025_Taban_Sıralama']:
+        rejected[_ranking_reject_reason(value)] += 1
+
+    df = df[ranking_ok].copy()
+    df['ranking_2025'] = rankings[ranking_ok].astype(np.int32)
+
+    puan_2025, _ = parse_turkish_float(df['2025_Taban_Puan'])
+    df['taban_puan_2025'] = puan_2025.astype(np.float32)
+
+    rankings_2024, ranking_2024_ok = parse_turkish_int(df['2024_TabanSıralama'])
+    df['ranking_2024'] = _int32_column(rankings_2024, ranking_2024_ok)
+
+    puan_2024, _ = parse_turkish_float(df['2024_TabanPuani'])
+    df['taban_puan_2024'] = puan_2024.astype(np.float32)
+
+    for column in CATEGORY_COLUMNS:
+        df[column] = strip_pdf_prefix(df[column])
+
+    df['ucret_2025'] = parse_fee(df['2025_Ucret'])
+    kontenjan, kontenjan_ok = parse_turkish_int(strip_pdf_prefix(df['2025_Kontenjan']))
+    df['kontenjan_2025'] = _int32_column(kontenjan, kontenjan_ok)
+
+    df = df.reset_index(drop=True)
+
+    report = {
+        'total_rows': total_rows,
+        'loaded_rows': len(df),
+        'rejected_rows': total_rows - len(df),
+        'rejected_by_reason': {reason: count for reason, count in rejected.items() if count}
+    }
+    return df, report
@@ -0,0 +1,120 @@
+# Kolon bazlı, tipli bölüm deposu
+# CSV pandas ile okunur (dataset_loader) ve yükleme anında kompakt kolonlara derlenir:
+# sayısal alanlar NumPy dizileri, Sehir/Universite/Tur/Ogrenim_sekli intern edilmiş kategori kodları,
+# bolum_adi/Aciklama ise benzersiz değerleri tek UTF-8 buffer'da tutan offset tablosu.
+# Sıcak yolda satır erişimi pandas Series kurmaz; DataFrame yüklemeden sonra tutulmaz.
+import sys
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = ['ranking_2025', 'taban_puan_2025', 'ranking_2024', 'taban_puan_2024', 'ucret_2025', 'kontenjan_2025']
+CATEGORY_COLUMNS = ['Sehir', 'Universite', 'Tur', 'Ogrenim_sekli']
+STRING_COLUMNS = ['bolum_adi', 'Aciklama']
+
+
+def _code_dtype(size: int):
+    return np.int16 if size < np.iinfo(np.int16).max else np.int32
+
+
+class CategoryColumn:
+    """Az sayıda farklı değer: satır başına kod + intern edilmiş değer tablosu"""
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = tuple(categories)
+        self._lookup = {value: code for code, value in enumerate(self.categories)}
+
+    @classmethod
+    def from_series(cls, series: pd.Series):
+        codes, uniques = pd.factorize(series.fillna(''))
+        return cls(codes.astype(_code_dtype(len(uniques))), [sys.intern(str(value)) for value in uniques])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+    def code_of(self, value: str):
+        """Değerin kodu; kolonda yoksa None"""
+        return self._lookup.get(value)
+
+    @property
+    def nbytes(self):
+        return int(self.codes.nbytes) + sum(sys.getsizeof(value) for value in self.categories)
+
+
+class StringColumn:
+    """Tekrarlayan uzun metinler: benzersiz değerler tek buffer'da, satırlar buffer'a kod ile bağlanır"""
+
+    def __init__(self, codes, buffer: bytes, offsets):
+        self.codes = codes
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def from_series(cls, series: pd.Series):
+        codes, uniques = pd.factorize(series.fillna(''))
+        encoded = [str(value).encode('utf-8') for value in uniques]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(codes.astype(np.int32), b''.join(encoded), offsets)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.value(self.codes[row])
+
+    @property
+    def unique_count(self):
+        return len(self.offsets) - 1
+
+    def value(self, code):
+        return self.buffer[self.offsets[code]:self.offsets[code + 1]].decode('utf-8')
+
+    def values(self):
+        """Benzersiz değerler, kod sırasıyla"""
+        return [self.value(code) for code in range(self.unique_count)]
+
+    @property
+    def nbytes(self):
+        return int(self.codes.nbytes) + len(self.buffer) + int(self.offsets.nbytes)
+
+
+class DepartmentStore:
+    def __init__(self, numeric, categories, strings):
+        self.numeric = numeric
+        self.categories = categories
+        self.strings = strings
+        self.size = len(next(iter(numeric.values())))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        """load_departments çıktısını kolonlara derler (DataFrame sadece burada kullanılır)"""
+        numeric = {name: np.ascontiguousarray(df[name].to_numpy()) for name in NUMERIC_COLUMNS}
+        categories = {name: CategoryColumn.from_series(df[name]) for name in CATEGORY_COLUMNS}
+        strings = {name: StringColumn.from_series(df[name]) for name in STRING_COLUMNS}
+        return cls(numeric, categories, strings)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        """Kolon erişimi: store['ranking_2025'][idx], store['Sehir'][idx] ..."""
+        for columns in (self.numeric, self.categories, self.strings):
+            if name in columns:
+                return columns[name]
+        raise KeyError(name)
+
+    def memory_footprint(self):
+        """Kolon başına byte miktarı"""
+        columns = {name: int(values.nbytes) for name, values in self.numeric.items()}
+        columns.update({name: column.nbytes for name, column in self.categories.items()})
+        columns.update({name: column.nbytes for name, column in self.strings.items()})
+        return columns
+
+    @property
+    def nbytes(self):
+        return sum(self.memory_footprint().values())
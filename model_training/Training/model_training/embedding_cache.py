@@ -0,0 +1,125 @@
+# Bölüm açıklaması embedding'leri için disk cache'i
+# Embedding'ler CSV'nin yanına .npy olarak, anahtar bilgisi ise .json sidecar dosyasına yazılır.
+# Anahtar = model adı + açıklama kolonunun hash'i; biri değişirse cache kendiliğinden geçersiz olur.
+import os
+import json
+import hashlib
+import logging
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 2: embedding'ler L2-normalize edilmiş olarak saklanır
+CACHE_FORMAT_VERSION = 2
+
+
+def content_hash(model_name: str, texts) -> str:
+    """Model adı ve metin listesinden deterministik cache anahtarı üretir"""
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}\0{model_name}\0".encode('utf-8'))
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def backend_cache_path(dataset_path: str, backend: str = 'torch') -> str:
+    """Cache dosyalarının türetildiği yol; torch dışı backend'ler ayrı dosya kullanır (X.csv -> X.onnx.csv)"""
+    if backend == 'torch':
+        return dataset_path
+    base, extension = os.path.splitext(dataset_path)
+    return f"{base}.{backend}{extension}"
+
+
+def cache_paths(dataset_path: str):
+    base = os.path.splitext(dataset_path)[0]
+    return base + '.embeddings.npy', base + '.embeddings.json'
+
+
+def load_embeddings(dataset_path: str, key: str, rows: int):
+    """Anahtar eşleşirse embedding'leri mmap ile açar, aksi halde None döner"""
+    npy_path, meta_path = cache_paths(dataset_path)
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+        return None
+
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        logger.warning(f"Unreadable embedding cache metadata: {meta_path}")
+        return None
+
+    if meta.get('key') != key or meta.get('rows') != rows:
+        logger.info(f"Embedding cache is stale for {dataset_path}")
+        return None
+
+    try:
+        embeddings = np.load(npy_path, mmap_mode='r')
+    except (OSError, ValueError):
+        logger.warning(f"Unreadable embedding cache: {npy_path}")
+        return None
+
+    if embeddings.shape[0] != rows:
+        return None
+    return embeddings
+
+
+def atomic_write(path: str, write, mode: str = 'wb', **open_kwargs):
+    """
+    Aynı dizinde benzersiz bir geçici dosyaya yazıp os.replace ile yerine koyar; aynı anda soğuk başlayan
+    süreçler (ör. sunucu + offline CLI) birbirinin geçici dosyasına yazmaz
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+    try:
+        # mkstemp 0600 açar; cache dosyaları diğer kullanıcıların worker'larınca da okunabilsin
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_embeddings(dataset_path: str, key: str, embeddings, model_name: str):
+    """Embedding'leri atomik olarak yazar; önce .npy, en son sidecar"""
+    npy_path, meta_path = cache_paths(dataset_path)
+    meta = {
+        'key': key,
+        'model_name': model_name,
+        'rows': int(embeddings.shape[0]),
+        'dim': int(embeddings.shape[1]),
+        'dtype': str(embeddings.dtype)
+    }
+
+    try:
+        atomic_write(npy_path, lambda f: np.save(f, np.ascontiguousarray(embeddings)))
+        atomic_write(meta_path, lambda f: json.dump(meta, f), mode='w', encoding='utf-8')
+    except OSError as e:
+        logger.warning(f"Could not write embedding cache for {dataset_path}: {e}")
+        return False
+
+    return True
+
+
+def load_or_encode(model, model_name: str, texts, dataset_path: str, **encode_kwargs):
+    """Cache varsa mmap ile yükler, yoksa encode edip diske yazar"""
+    key = content_hash(model_name, texts)
+    embeddings = load_embeddings(dataset_path, key, len(texts))
+    if embeddings is not None:
+        logger.info(f"Loaded {len(texts)} cached embeddings for {dataset_path}")
+        return embeddings
+
+    embeddings = np.asarray(model.encode(texts, **encode_kwargs), dtype=np.float32)
+    if save_embeddings(dataset_path, key, embeddings, model_name):
+        # Yazılan dosyayı mmap ile açarak worker'lar arasında page cache paylaşılır
+        cached = load_embeddings(dataset_path, key, len(texts))
+        if cached is not None:
+            return cached
+    return embeddings
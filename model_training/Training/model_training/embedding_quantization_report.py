@@ -0,0 +1,101 @@
+# float16 / int8 embedding depolamanın float32'ye göre bellek kazancı ve skor kayması raporu
+# Kullanım:
+#   python embedding_quantization_report.py --dataset ../../../Backend/Data/Sayisal_Bolumler_Aciklamali.csv
+# Aynı dataset her tip için ayrı bir engine ile yüklenir (model ve embedding cache'i paylaşılır);
+# test prompt'larında açıklama skorları ve recommend çıktıları float32 referansla karşılaştırılır.
+import time
+import logging
+import argparse
+
+import numpy as np
+
+from model_registry import get_model
+from Similarity_Prompt import HybridRecommendationEngine
+
+REPORT_PROMPTS = [
+    "sanat ve tasarım çok seviyorum 120 bin sıralama",
+    "mühendislik istiyorum tıp istemiyorum 50 bin",
+    "hukuk okumak istiyorum avukat olmak istiyorum 20 bin",
+    "sağlık alanı istiyorum 450k sıralama",
+    "öğretmen olmak istiyorum, teknoloji sevmiyorum 300.000",
+    "yazılım geliştirmek ve oyun yapmak istiyorum",
+    "spor ve fitness, antrenör olmak istiyorum sıralamam 800000",
+    "finans sektöründe bankacı olmak istiyorum 35 bin"
+]
+
+
+def matvec_microseconds(embeddings, query, repeats: int):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        embeddings @ query
+    return (time.perf_counter() - started) / repeats * 1e6
+
+
+def compare(baseline, engine, prompts, top_k: int, repeats: int):
+    score_drift = []
+    identical = 0
+    overlaps = []
+    recommendation_drift = []
+    for prompt in prompts:
+        query = baseline.parse_query(prompt)
+        if query.interests.strip():
+            embedding = baseline.encode_query(query.interests)
+            reference = np.asarray(baseline.department_embeddings @ embedding)
+            score_drift.append(np.abs(np.asarray(engine.department_embeddings @ embedding) - reference))
+
+        expected = baseline.recommend_query(query, top_k)
+        got = engine.recommend_query(query, top_k)
+        expected_keys = [(r['bolum_adi'], r['universite'], r['ranking_2025']) for r in expected]
+        got_keys = [(r['bolum_adi'], r['universite'], r['ranking_2025']) for r in got]
+        identical += expected_keys == got_keys
+        if expected_keys:
+            overlaps.append(len(set(expected_keys) & set(got_keys)) / len(expected_keys))
+        scores = {key: r['similarity_score'] for key, r in zip(got_keys, got)}
+        recommendation_drift += [abs(scores[key] - r['similarity_score']) for key, r in zip(expected_keys, expected) if key in scores]
+
+    drift = np.concatenate(score_drift) if score_drift else np.zeros(1)
+    probe = baseline.encode_query('teknoloji')
+    return {
+        'embedding_bytes': int(engine.department_embeddings.nbytes),
+        'matvec_us': matvec_microseconds(engine.department_embeddings, probe, repeats),
+        'max_score_drift': float(drift.max()),
+        'mean_score_drift': float(drift.mean()),
+        'identical_top_k': f"{identical}/{len(prompts)}",
+        'top_k_overlap': float(np.mean(overlaps)) if overlaps else 1.0,
+        'max_recommendation_drift': max(recommendation_drift, default=0.0)
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Nicemlenmiş embedding bellek / skor kayması raporu')
+    parser.add_argument('--dataset', required=True)
+    parser.add_argument('--top-k', type=int, default=6)
+    parser.add_argument('--repeats', type=int, default=200, help='matvec süre ölçümü tekrar sayısı')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger('Similarity_Prompt').setLevel(logging.WARNING)
+
+    model = get_model()
+    baseline = HybridRecommendationEngine(args.dataset, model=model, response_cache_size=0)
+    baseline_report = compare(baseline, baseline, REPORT_PROMPTS, args.top_k, args.repeats)
+    float32_bytes = baseline_report['embedding_bytes']
+
+    print(f"{'dtype':<9}{'bytes':>10}{'saved':>8}{'matvec us':>11}{'max drift':>11}{'mean drift':>12}"
+          f"{'same top-k':>12}{'overlap':>9}{'rec drift':>11}")
+    for dtype in ('float32', 'float16', 'int8'):
+        if dtype == 'float32':
+            report = baseline_report
+        else:
+            engine = HybridRecommendationEngine(args.dataset, model=model, response_cache_size=0, embedding_dtype=dtype)
+            report = compare(baseline, engine, REPORT_PROMPTS, args.top_k, args.repeats)
+        saved = 1.0 - report['embedding_bytes'] / float32_bytes
+        print(f"{dtype:<9}{report['embedding_bytes']:>10}{saved:>8.1%}{report['matvec_us']:>11.1f}"
+              f"{report['max_score_drift']:>11.2e}{report['mean_score_drift']:>12.2e}{report['identical_top_k']:>12}"
+              f"{report['top_k_overlap']:>9.3f}{report['max_recommendation_drift']:>11.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# Paylaşılan SentenceTransformer önünde mikro-batch kuyruğu
+# Eşzamanlı isteklerin tekil encode çağrıları birkaç milisaniyelik pencere içinde toplanır,
+# tek bir model.encode çağrısıyla işlenir ve sonuçlar bekleyen Future'lara dağıtılır.
+import os
+import time
+import queue
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+from metrics import record_encoder_batch
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchEncoder:
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = Counter()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _ensure_worker(self):
+        # Fork sonrası thread çocuk sürece geçmez; worker süreç başına yeniden başlatılır
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name='encoder-batcher', daemon=True)
+            self._pid = pid
+            self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Metni kuyruğa ekler; normalize embedding'i dönen Future ile gelir"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str):
+        return self.submit(text).result()
+
+    def _collect(self, pending: queue.Queue):
+        batch = [pending.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(pending.get_nowait())
+                else:
+                    batch.append(pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending: queue.Queue):
+        while True:
+            batch = self._collect(pending)
+            # Aynı pencerede gelen aynı metinler bir kez encode edilir
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                embeddings = self.model.encode(
+                    texts, batch_size=len(texts), normalize_embeddings=True, show_progress_bar=False
+                )
+                embeddings = np.asarray(embeddings, dtype=np.float32)
+                by_text = dict(zip(texts, embeddings))
+                for text, future in batch:
+                    future.set_result(by_text[text])
+            except Exception as e:
+                logger.exception("Batched encode failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            record_encoder_batch('micro_batch', len(texts))
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.batch_sizes[len(texts)] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'batches': self.batches,
+                'items': self.items,
+                'mean_batch_size': round(self.items / self.batches, 3) if self.batches else 0.0,
+                'batch_size_counts': dict(sorted(self.batch_sizes.items()))
+            }
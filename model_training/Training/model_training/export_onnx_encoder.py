@@ -0,0 +1,145 @@
+# Sorgu encoder'ını ONNX'e aktarır, dinamik int8 quantize eder ve PyTorch backend'iyle karşılaştırır
+# Kullanım:
+#   python export_onnx_encoder.py export --output onnx_models/paraphrase-multilingual-MiniLM-L12-v2
+#   python export_onnx_encoder.py check --model-dir onnx_models/paraphrase-multilingual-MiniLM-L12-v2 \
+#       --dataset ../../../Backend/Data/Sayisal_Bolumler_Aciklamali.csv
+# export için torch + sentence-transformers + onnxruntime gerekir; servis tarafında sadece onnxruntime + tokenizers.
+# check: kosinüs uyumu (sorgu kombinasyonları + bölüm açıklamaları) ve batch 1/8/64 gecikme karşılaştırması.
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+
+import numpy as np
+
+from model_registry import DEFAULT_MODEL_NAME
+from onnx_encoder import OnnxSentenceEncoder, MODEL_FILE, CONFIG_FILE
+from interest_rules import InterestRuleEngine
+
+DEFAULT_BATCH_SIZES = [1, 8, 64]
+
+
+def export(model_name: str, output_dir: str, opset: int = 14):
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    model = SentenceTransformer(model_name, device='cpu')
+    pooling = model[1]
+    if not getattr(pooling, 'pooling_mode_mean_tokens', False) or len(model) > 2:
+        raise ValueError("Sadece mean pooling kullanan (ek katmansız) modeller destekleniyor")
+
+    os.makedirs(output_dir, exist_ok=True)
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    sample = tokenizer(['örnek sorgu metni'], return_tensors='pt')
+
+    float_path = os.path.join(output_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, (sample['input_ids'], sample['attention_mask']), float_path,
+            input_names=['input_ids', 'attention_mask'], output_names=['last_hidden_state'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'last_hidden_state': {0: 'batch', 1: 'sequence'}
+            },
+            opset_version=opset
+        )
+
+    # Ağırlıklar int8, aktivasyonlar çalışma anında quantize edilir (kalibrasyon verisi gerekmez)
+    quantize_dynamic(float_path, os.path.join(output_dir, MODEL_FILE), weight_type=QuantType.QInt8)
+    os.remove(float_path)
+
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_name': model_name,
+            'max_seq_length': model.max_seq_length,
+            'dimension': model.get_sentence_embedding_dimension(),
+            'pad_token': tokenizer.pad_token
+        }, f, ensure_ascii=False, indent=2)
+
+    size = os.path.getsize(os.path.join(output_dir, MODEL_FILE))
+    print(f"Exported {model_name} -> {output_dir} ({size / 1e6:.1f} MB int8)")
+
+
+def parity_texts(dataset_path: str = None, max_combination: int = 2):
+    """Sorgu uzayı (kategori kombinasyonları) + opsiyonel olarak dataset açıklamaları"""
+    categories = InterestRuleEngine.from_file().interest_categories
+    texts = [', '.join(combination) for size in range(1, max_combination + 1)
+             for combination in itertools.combinations(sorted(categories), size)]
+    if dataset_path:
+        from dataset_loader import load_departments
+        departments, _ = load_departments(dataset_path)
+        texts += departments['Aciklama'].drop_duplicates().tolist()
+    return texts
+
+
+def latency_ms(model, texts, batch_size: int, repeats: int):
+    batch = list(itertools.islice(itertools.cycle(texts), batch_size))
+    model.encode(batch, batch_size=batch_size, normalize_embeddings=True)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.encode(batch, batch_size=batch_size, normalize_embeddings=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.median(timings))
+
+
+def check(model_dir: str, dataset_path: str = None, batch_sizes=None, repeats: int = 20, min_cosine: float = 0.99):
+    from sentence_transformers import SentenceTransformer
+
+    onnx_model = OnnxSentenceEncoder(model_dir)
+    torch_model = SentenceTransformer(onnx_model.config.get('model_name', DEFAULT_MODEL_NAME), device='cpu')
+
+    texts = parity_texts(dataset_path)
+    reference = torch_model.encode(texts, batch_size=64, normalize_embeddings=True)
+    candidate = onnx_model.encode(texts, batch_size=64, normalize_embeddings=True)
+    cosines = np.sum(reference * candidate, axis=1)
+    print(f"Parity over {len(texts)} texts: min cosine {cosines.min():.5f}, mean {cosines.mean():.5f}, "
+          f"p01 {np.percentile(cosines, 1):.5f}")
+
+    queries = texts[:200]
+    print(f"\n{'batch':>6}{'torch ms':>11}{'onnx ms':>10}{'speedup':>9}")
+    for batch_size in batch_sizes or DEFAULT_BATCH_SIZES:
+        torch_ms = latency_ms(torch_model, queries, batch_size, repeats)
+        onnx_ms = latency_ms(onnx_model, queries, batch_size, repeats)
+        print(f"{batch_size:>6}{torch_ms:>11.2f}{onnx_ms:>10.2f}{torch_ms / onnx_ms:>8.2f}x")
+
+    return bool(cosines.min() >= min_cosine)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ONNX int8 sorgu encoder export / parity / latency')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export')
+    export_parser.add_argument('--model-name', default=DEFAULT_MODEL_NAME)
+    export_parser.add_argument('--output', required=True)
+    export_parser.add_argument('--opset', type=int, default=14)
+
+    check_parser = commands.add_parser('check')
+    check_parser.add_argument('--model-dir', required=True)
+    check_parser.add_argument('--dataset', help='Açıklamaları da parity setine ekler')
+    check_parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    check_parser.add_argument('--repeats', type=int, default=20)
+    check_parser.add_argument('--min-cosine', type=float, default=0.99)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'export':
+        export(args.model_name, args.output, args.opset)
+        return 0
+    ok = check(args.model_dir, args.dataset, args.batch_sizes, args.repeats, args.min_cosine)
+    if not ok:
+        print(f"Parity check failed: min cosine < {args.min_cosine}", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# Yapısal filtre indeksi: şehir, üniversite türü, öğrenim şekli, ücret ve kontenjan
+# Her kategori değeri için satır listesi (posting list) ranking_2025 sırasıyla tutulur; böylece bir
+# değerin sıralama penceresine düşen satırları searchsorted ile doğrudan dilimlenir. Diğer boyutlar ve
+# sayısal eşikler sadece bu küçük aday kümesi üzerinde maske olarak uygulanır. Benzerlik hesabı
+# filtrelenmiş adaylarla başladığı için filtre seçiciliği arttıkça skorlanan satır sayısı düşer.
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# API filtre adı -> depo kolonu
+CATEGORY_FILTERS = {
+    'sehir': 'Sehir',
+    'universite': 'Universite',
+    'tur': 'Tur',
+    'ogrenim_sekli': 'Ogrenim_sekli'
+}
+
+
+class DepartmentFilters(NamedTuple):
+    """Normalize edilmiş filtreler (hashable - cevap cache anahtarına girer)"""
+    categories: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+    max_ucret: Optional[int] = None
+    min_kontenjan: Optional[int] = None
+
+    def __bool__(self):
+        return bool(self.categories) or self.max_ucret is not None or self.min_kontenjan is not None
+
+
+class FilterError(ValueError):
+    """İstemcinin gönderdiği filtre hatalı (API'de 400); motor/config hatalarından ayrılır"""
+
+
+def normalize_value(value) -> str:
+    """Türkçe büyük/küçük harf farkını kaldırır: 'İSTANBUL', 'istanbul' -> 'istanbul'"""
+    return str(value).strip().replace('İ', 'i').replace('I', 'ı').lower()
+
+
+def parse_filters(filters) -> DepartmentFilters:
+    """API'den gelen sözlüğü doğrular ve DepartmentFilters'a çevirir; hatalı girdide FilterError"""
+    if not filters:
+        return DepartmentFilters()
+    if not isinstance(filters, dict):
+        raise FilterError("filters bir nesne olmalı")
+
+    unknown = set(filters) - set(CATEGORY_FILTERS) - {'max_ucret', 'min_kontenjan'}
+    if unknown:
+        raise FilterError(f"Bilinmeyen filtre: {', '.join(sorted(unknown))}")
+
+    categories = []
+    for name in sorted(CATEGORY_FILTERS):
+        values = filters.get(name)
+        if values is None or values == []:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            raise FilterError(f"{name} bir metin veya metin listesi olmalı")
+        categories.append((name, tuple(sorted({normalize_value(value) for value in values}))))
+
+    def _threshold(name):
+        # Sadece negatif olmayan tam sayı (veya rakamlardan oluşan metin); true / 3.9 / -1 reddedilir
+        value = filters.get(name)
+        if value is None:
+            return None
+        if isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+            return int(value)
+        if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            return value
+        raise FilterError(f"{name} negatif olmayan bir tam sayı olmalı")
+
+    return DepartmentFilters(tuple(categories), _threshold('max_ucret'), _threshold('min_kontenjan'))
+
+
+class FilterIndex:
+    def __init__(self, store, ranking_order, sorted_rankings):
+        self.store = store
+        self.fees = store['ucret_2025']
+        self.quotas = store['kontenjan_2025']
+        self.columns = {}
+        self.postings = {}
+
+        for name, column_name in CATEGORY_FILTERS.items():
+            column = store.categories[column_name]
+            lookup = {}
+            for code, value in enumerate(column.categories):
+                lookup.setdefault(normalize_value(value), []).append(code)
+
+            # Kodlar ranking sırasıyla gruplanır; stable sıralama grup içi ranking sırasını korur
+            codes_by_rank = column.codes[ranking_order]
+            grouping = np.argsort(codes_by_rank, kind='stable')
+            bounds = np.searchsorted(codes_by_rank[grouping], np.arange(len(column.categories) + 1))
+            postings = []
+            for code in range(len(column.categories)):
+                positions = grouping[bounds[code]:bounds[code + 1]]
+                postings.append((ranking_order[positions], sorted_rankings[positions]))
+
+            self.columns[name] = (column, lookup)
+            self.postings[name] = postings
+
+    def codes_for(self, name: str, values):
+        _, lookup = self.columns[name]
+        codes = []
+        for value in values:
+            codes.extend(lookup.get(value, ()))
+        return codes
+
+    def options(self):
+        """Filtrelenebilir değerler (kolon başına, satır sayısıyla)"""
+        return {
+            name: {value: len(self.postings[name][code][0]) for code, value in enumerate(column.categories)}
+            for name, (column, _) in self.columns.items()
+        }
+
+    def _window_slice(self, rows, rankings, ranking_window):
+        if ranking_window is None:
+            return rows
+        start = np.searchsorted(rankings, ranking_window[0], side='left')
+        end = np.searchsorted(rankings, ranking_window[1], side='right')
+        return rows[start:end]
+
+    def candidates(self, window_candidates, ranking_window, filters: DepartmentFilters):
+        """Sıralama penceresi ile filtrelerin kesişimi (satır indeksleri)"""
+        if not filters:
+            return window_candidates
+
+        allowed = {name: self.codes_for(name, values) for name, values in filters.categories}
+        if any(len(codes) == 0 for codes in allowed.values()):
+            return np.empty(0, dtype=window_candidates.dtype)
+
+        if allowed:
+            # En seçici boyutun posting list'leri pencereyle dilimlenir, gerisi maske olarak uygulanır
+            driver = min(allowed, key=lambda name: sum(len(self.postings[name][code][0]) for code in allowed[name]))
+            parts = [self._window_slice(*self.postings[driver][code], ranking_window) for code in allowed[driver]]
+            candidates = parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+            for name, codes in allowed.items():
+                if name == driver or len(candidates) == 0:
+                    continue
+                column, _ = self.columns[name]
+                accepted = np.zeros(len(column.categories), dtype=bool)
+                accepted[codes] = True
+                candidates = candidates[accepted[column.codes[candidates]]]
+        else:
+            candidates = window_candidates
+
+        if filters.max_ucret is not None:
+            # Ücreti bilinmeyen ('Bak') satırlar ücret filtresinde elenir
+            fees = self.fees[candidates]
+            candidates = candidates[(fees >= 0) & (fees <= filters.max_ucret)]
+        if filters.min_kontenjan is not None:
+            candidates = candidates[self.quotas[candidates] >= filters.min_kontenjan]
+
+        return candidates
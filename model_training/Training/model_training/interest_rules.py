@@ -0,0 +1,195 @@
+# İlgi alanı / sıralama çıkarım kuralları
+# Kurallar interest_rules.json dosyasından okunur ve engine kurulurken bir kez derlenir;
+# istek başına sözlük kurma ve onlarca ayrı re.search çağrısı yapılmaz.
+import os
+import re
+import json
+import logging
+import itertools
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'interest_rules.json')
+
+
+def _compile_category_patterns(pattern_groups: dict):
+    """Kategori başına tüm pattern'leri tek alternation regex'e derler"""
+    return [
+        (category, re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)))
+        for category, patterns in pattern_groups.items()
+    ]
+
+
+class InterestRuleEngine:
+    """Derlenmiş ilgi alanı ve sıralama kuralları"""
+
+    def __init__(self, rules: dict):
+        self.rules = rules
+        self.ranking_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in rules['ranking_patterns']]
+        self.positive_patterns = _compile_category_patterns(rules['positive_patterns'])
+        self.negative_patterns = _compile_category_patterns(rules['negative_patterns'])
+        self.career_patterns = _compile_category_patterns(rules['career_patterns'])
+        self.context_keywords = rules['context_keywords']
+        self._compile_context_keywords()
+
+        # extract() çıktısının alabileceği tüm etiketler ('genel' dahil)
+        self.interest_categories = list(dict.fromkeys(itertools.chain(
+            rules['positive_patterns'], rules['career_patterns'], rules['context_keywords'], ['genel']
+        )))
+
+        # Keyword boost sözlüğü: sütun sırası keyword_matrix ile aynıdır
+        self.expanded_mappings = rules['expanded_mappings']
+        self.keyword_vocab = list(dict.fromkeys(
+            keyword for keywords in self.expanded_mappings.values() for keyword in keywords
+        ))
+        self._keyword_columns = {keyword: i for i, keyword in enumerate(self.keyword_vocab)}
+
+        # Negatif filtre: "<keyword> <negatif kelime>" veya "<negatif kelime> <keyword>" ifadeleri
+        self.negative_categories = rules['negative_categories']
+        self.negative_category_names = list(self.negative_categories)
+        self._negation_phrases = [
+            [
+                phrase
+                for keyword in keywords
+                for neg_word in rules['negative_words']
+                for phrase in (f"{keyword} {neg_word}", f"{neg_word} {keyword}")
+            ]
+            for keywords in self.negative_categories.values()
+        ]
+
+    @classmethod
+    def from_file(cls, path: str = None):
+        path = path or os.environ.get('INTEREST_RULES_PATH') or DEFAULT_RULES_PATH
+        with open(path, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+        logger.info(f"Interest rules loaded from {path}")
+        return cls(rules)
+
+    def _compile_context_keywords(self):
+        # Tüm literal keyword'ler tek bir lookahead alternation'da taranır. Her pozisyonda en uzun
+        # keyword yakalanır; o pozisyonda eşleşen daha kısa keyword'ler onun önekleri olduğundan
+        # kategorileri önek kapanışı üzerinden eklenir.
+        keyword_categories = {}
+        for category, keywords in self.context_keywords.items():
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword, set()).add(category)
+
+        self._keyword_categories = {}
+        for keyword in keyword_categories:
+            categories = set()
+            for other, other_categories in keyword_categories.items():
+                if keyword.startswith(other):
+                    categories |= other_categories
+            self._keyword_categories[keyword] = frozenset(categories)
+
+        ordered = sorted(keyword_categories, key=len, reverse=True)
+        self._context_regex = re.compile('(?=(' + '|'.join(re.escape(k) for k in ordered) + '))')
+
+    def extract_ranking(self, user_input: str):
+        ranking = None
+        for pattern in self.ranking_patterns:
+            ranking_match = pattern.search(user_input)
+            if ranking_match:
+                rank_str = ranking_match.group(1)
+
+                try:
+                    if ',' in rank_str:
+                        continue
+
+                    if 'bin' in user_input.lower() and not 'k' in rank_str:
+                        ranking = int(rank_str) * 1000
+                    elif 'k' in rank_str.lower():
+                        ranking = int(float(rank_str.lower().replace('k', '')) * 1000)
+                    elif '.' in rank_str and len(rank_str) > 4:
+                        ranking = int(rank_str.replace('.', ''))
+                    else:
+                        ranking = int(rank_str)
+
+                    if ranking:
+                        break
+
+                except (ValueError, TypeError):
+                    continue
+        return ranking
+
+    def extract(self, text: str):
+        """Metinden (ilgi alanları, pozitif boost kategorileri, hariç tutulanlar) çıkarır"""
+        text_lower = text.lower()
+        extracted_interests = set()
+        excluded_interests = set()
+        positive_boost = set()
+
+        # Pozitif ifadeler (BOOST)
+        for category, regex in self.positive_patterns:
+            if regex.search(text_lower):
+                positive_boost.add(category)
+                extracted_interests.add(category)
+
+        # Negatif ifadeler (EXCLUDE)
+        for category, regex in self.negative_patterns:
+            if regex.search(text_lower):
+                excluded_interests.add(category)
+
+        for category, regex in self.career_patterns:
+            if category not in excluded_interests and regex.search(text_lower):
+                extracted_interests.add(category)
+
+        keyword_hits = set()
+        for match in self._context_regex.finditer(text_lower):
+            keyword_hits |= self._keyword_categories[match.group(1)]
+
+        for category in self.context_keywords:
+            if category not in excluded_interests and category in keyword_hits:
+                extracted_interests.add(category)
+
+        final_interests = extracted_interests - excluded_interests
+        result = list(final_interests) if final_interests else ['genel']
+        return result, positive_boost, excluded_interests
+
+    def build_keyword_matrix(self, texts):
+        """texts x keyword_vocab uint8 matris: metin keyword'ü içeriyorsa 1"""
+        matrix = np.zeros((len(texts), len(self.keyword_vocab)), dtype=np.uint8)
+        for row, text in enumerate(texts):
+            for column, keyword in enumerate(self.keyword_vocab):
+                if keyword in text:
+                    matrix[row, column] = 1
+        return matrix
+
+    def keyword_weights(self, interests: str, positive_boost_categories=()):
+        """İlgi alanı metninden keyword_vocab üzerinde boost ağırlık vektörü üretir"""
+        all_keywords = set()
+        for word in interests.lower().split(','):
+            word = word.strip()
+            for category, expanded_keywords in self.expanded_mappings.items():
+                if word in expanded_keywords:
+                    all_keywords.update(expanded_keywords)
+                    break
+
+        weights = np.zeros(len(self.keyword_vocab), dtype=np.float64)
+        for keyword in all_keywords:
+            base_boost = 0.3
+            # Pozitif ifadeler ekstra boost alır
+            for boost_category in positive_boost_categories:
+                if keyword in self.expanded_mappings.get(boost_category, []):
+                    base_boost += 0.2
+                    break
+            weights[self._keyword_columns[keyword]] = base_boost
+        return weights
+
+    def build_negative_membership(self, names):
+        """names x negative_categories bool matris: bölüm adı kategorinin bir keyword'ünü içeriyorsa True"""
+        membership = np.zeros((len(names), len(self.negative_category_names)), dtype=bool)
+        for row, name in enumerate(names):
+            for column, keywords in enumerate(self.negative_categories.values()):
+                membership[row, column] = any(keyword in name for keyword in keywords)
+        return membership
+
+    def negated_categories(self, user_input: str):
+        """Kullanıcının istemediğini söylediği kategorilerin sütun indeksleri"""
+        user_lower = user_input.lower()
+        return [
+            column for column, phrases in enumerate(self._negation_phrases)
+            if any(phrase in user_lower for phrase in phrases)
+        ]
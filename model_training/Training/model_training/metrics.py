@@ -0,0 +1,205 @@
+# Süreç içi metrikler (Prometheus text formatı)
+# Öneri hattının her aşaması (extract, ranking_filter, filters, negative_filter, retrieve, encode, similarity,
+# batch_similarity, boost, top_k, format) için gecikme histogramı, aday kümesi boyutları, cache sonuçları ve encoder batch
+# boyutları tutulur. prometheus_client bağımlılığı yok; render() /metrics için metni üretir.
+# İstek bazlı izleme (RequestTrace) contextvars ile taşınır: Backend her cevaba Server-Timing başlığı ekler.
+# Not: gunicorn'da her worker kendi sayaçlarını tutar; /metrics cevabı o isteği karşılayan worker'ındır.
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Saniye cinsinden; tek aşama genelde < 1 ms, encode cache miss'i 5-50 ms
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+CANDIDATE_BUCKETS = (0, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra) if extra else [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = tuple(label_names)
+        # label değerleri -> [bucket başına (kümülatif olmayan) sayılar + inf, toplam, adet]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, *label_values):
+        """(kümülatif bucket sayıları, toplam, adet) - test ve raporlar için"""
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                return [0] * (len(self.buckets) + 1), 0.0, 0
+            counts, total, count = list(series[0]), series[1], series[2]
+        cumulative = []
+        running = 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative, total, count
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            label_sets = sorted(self._series)
+        for label_values in label_sets:
+            cumulative, total, count = self.snapshot(*label_values)
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), cumulative):
+                labels = _format_labels(self.label_names, label_values, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names=()):
+        return self._get_or_create(Counter, name, help_text, label_names)
+
+    def histogram(self, name: str, help_text: str, buckets, label_names=()):
+        return self._get_or_create(Histogram, name, help_text, buckets, label_names)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'recommend_stage_seconds', 'Öneri hattı aşama süreleri', LATENCY_BUCKETS, ('stage',)
+)
+CANDIDATES = REGISTRY.histogram(
+    'recommend_candidates', 'Aşama sonrası kalan aday bölüm sayısı', CANDIDATE_BUCKETS, ('stage',)
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    'recommend_cache_lookups_total', 'Cache sorguları (hit / miss)', ('cache', 'result')
+)
+ENCODER_BATCH_SIZE = REGISTRY.histogram(
+    'encoder_batch_size', 'Tek model.encode çağrısındaki metin sayısı', BATCH_SIZE_BUCKETS, ('path',)
+)
+
+
+class RequestTrace:
+    """Bir isteğin aşama süreleri (aynı aşama birden çok kez çalışırsa toplanır)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self):
+        """Server-Timing başlık değeri (ms); sonda isteğin toplam süresi"""
+        entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.3f}")
+        return ', '.join(entries)
+
+
+_current_trace = contextvars.ContextVar('recommend_trace', default=None)
+
+
+def begin_trace():
+    trace = RequestTrace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(handle):
+    trace, token = handle
+    _current_trace.reset(token)
+    return trace
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_candidates(stage: str, count: int):
+    CANDIDATES.observe(count, stage)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache, 'hit' if hit else 'miss')
+
+
+def record_encoder_batch(path: str, size: int):
+    ENCODER_BATCH_SIZE.observe(size, path)
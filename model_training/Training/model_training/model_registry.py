@@ -0,0 +1,131 @@
+# Süreç genelinde paylaşılan model kayıt defteri
+# Her dataset engine'i kendi SentenceTransformer kopyasını yüklemek yerine
+# buradan aynı örneği alır; böylece worker başına model ağırlıkları bir kez tutulur.
+import os
+import threading
+import logging
+
+from query_cache import QueryEmbeddingCache
+from encoder_batcher import MicroBatchEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+# Encoder backend'i: 'torch' (SentenceTransformer, varsayılan) veya 'onnx' (int8 ONNX Runtime, bkz. onnx_encoder.py)
+ENCODER_BACKENDS = ('torch', 'onnx')
+ONNX_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'onnx_models')
+
+_models = {}
+_query_caches = {}
+_batch_encoders = {}
+_lock = threading.Lock()
+
+
+def _load_encoder(model_name: str, backend: str):
+    if backend == 'onnx':
+        from onnx_encoder import OnnxSentenceEncoder
+        model_dir = os.environ.get('ONNX_MODEL_DIR') or os.path.join(ONNX_MODELS_DIR, model_name)
+        return OnnxSentenceEncoder(model_dir)
+    if backend == 'torch':
+        # torch sadece bu backend seçildiğinde import edilir; ONNX worker'ları torch yüklemez
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    raise ValueError(f"Bilinmeyen encoder backend: {backend} (seçenekler: {', '.join(ENCODER_BACKENDS)})")
+
+
+def encoder_backend(model) -> str:
+    """Yüklü encoder'ın backend adı (OnnxSentenceEncoder ve SentenceTransformer >= 3.2 'backend' taşır)"""
+    return getattr(model, 'backend', 'torch')
+
+
+def encoder_key(model_name: str, backend: str = 'torch') -> str:
+    """Model + backend anahtarı; disk cache'leri de bununla anahtarlanır (ONNX çıktısı torch cache'ine yazılmaz)"""
+    return model_name if backend == 'torch' else f"{model_name} ({backend})"
+
+
+def selected_backend() -> str:
+    return os.environ.get('ENCODER_BACKEND', 'torch')
+
+
+def set_torch_threads(num_threads: int) -> bool:
+    """torch backend seçiliyse intra-op thread sayısını ayarlar; diğer backend'lerde torch import edilmez"""
+    if selected_backend() != 'torch':
+        return False
+    try:
+        import torch
+    except ImportError:
+        return False
+    torch.set_num_threads(num_threads)
+    return True
+
+
+def get_model(model_name: str = DEFAULT_MODEL_NAME, backend: str = None):
+    """Modeli süreç içinde bir kez yükler, sonraki çağrılarda aynı örneği döner"""
+    backend = backend or selected_backend()
+    key = encoder_key(model_name, backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            logger.info(f"Loading shared encoder: {key}")
+            model = _load_encoder(model_name, backend)
+            _models[key] = model
+
+    return model
+
+
+def get_query_cache(model_name: str = DEFAULT_MODEL_NAME, max_size: int = 1024):
+    """Model başına tek sorgu embedding cache'i - tüm dataset engine'leri paylaşır"""
+    with _lock:
+        cache = _query_caches.get(model_name)
+        if cache is None:
+            cache = QueryEmbeddingCache(max_size=max_size)
+            _query_caches[model_name] = cache
+    return cache
+
+
+def get_batch_encoder(model_name: str = DEFAULT_MODEL_NAME, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+    """Paylaşılan encoder önündeki mikro-batch kuyruğu (model başına bir tane)"""
+    model = get_model(model_name)
+    with _lock:
+        encoder = _batch_encoders.get(model_name)
+        if encoder is None:
+            encoder = MicroBatchEncoder(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+            _batch_encoders[model_name] = encoder
+    return encoder
+
+
+def batch_encoder_stats():
+    return {name: encoder.stats() for name, encoder in _batch_encoders.items()}
+
+
+def query_cache_stats():
+    return {name: cache.stats() for name, cache in _query_caches.items()}
+
+
+def loaded_models():
+    """Yüklü modellerin isim -> örnek kopyası"""
+    return dict(_models)
+
+
+def model_memory_bytes(model) -> int:
+    """Model parametre ve buffer'larının kapladığı byte miktarı"""
+    if hasattr(model, 'memory_bytes'):
+        return model.memory_bytes()
+    total = 0
+    for attr in ('parameters', 'buffers'):
+        tensors = getattr(model, attr, None)
+        if tensors is None:
+            continue
+        for tensor in tensors():
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def shared_memory_report():
+    """Paylaşılan modellerin bellek raporu"""
+    return {name: model_memory_bytes(model) for name, model in _models.items()}
@@ -0,0 +1,197 @@
+# Flask sunucusu olmadan toplu (offline) skorlama
+# Girdi dosyası veya stdin'deki prompt'lar (NDJSON/CSV) generator zinciriyle okunur, chunk'lara bölünür,
+# süreç havuzunda recommend_many ile skorlanır ve sonuçlar girdi sırasıyla satır satır yazılır.
+# Kullanım:
+#   python offline_scoring.py --dataset ../../../Backend/Data/Sayisal_Bolumler_Aciklamali.csv prompts.ndjson -o out.ndjson
+#   cat prompts.csv | python offline_scoring.py --dataset ... --input-format csv --workers 4 --chunk-size 512
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import itertools
+import multiprocessing
+
+from Similarity_Prompt import HybridRecommendationEngine
+from model_registry import set_torch_threads
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FIELDS = ['bolum_adi', 'universite', 'sehir', 'ranking_2025', 'similarity_score', 'keyword_boost']
+
+# Worker süreç başına tek engine; fork ile başlatılan havuzda ana süreçteki örnek miras alınır.
+# Engine kurulduğu dataset yoluyla birlikte tutulur; farklı bir yol istenirse yeniden kurulur.
+_engine = None
+_engine_path = None
+_top_k = 10
+_tolerance = 0.20
+
+
+def read_prompts(stream, input_format: str = 'ndjson', column: str = 'user_input'):
+    """
+    (id, prompt) çiftleri üretir; NDJSON satırı düz metin ya da {"id", "user_input"} nesnesi olabilir.
+    id verilmeyen satırlar 1'den başlayan satır numarasını metin olarak alır (CSV'de veri satırı, NDJSON'da dosya satırı).
+    """
+    if input_format == 'csv':
+        for row_number, row in enumerate(csv.DictReader(stream), 1):
+            yield row.get('id') or str(row_number), row.get(column) or ''
+        return
+
+    for row_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Satır {row_number}: geçersiz JSON ({e})") from None
+        if isinstance(record, str):
+            yield str(row_number), record
+        elif isinstance(record, dict):
+            yield record.get('id', str(row_number)), record.get(column) or ''
+        else:
+            raise ValueError(f"Satır {row_number}: metin veya nesne bekleniyordu, {type(record).__name__} geldi")
+
+
+def chunked(rows, chunk_size: int):
+    """Generator'ı sabit boyutlu listelere böler - tüm girdi belleğe alınmaz"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker(dataset_path: str, top_k: int, tolerance: float):
+    global _top_k, _tolerance
+    # Paralellik süreç sayısından gelir; her worker tek torch thread'i kullanır (ONNX backend'inde torch yüklenmez)
+    set_torch_threads(1)
+    _top_k = top_k
+    _tolerance = tolerance
+    if _engine is None or _engine_path != dataset_path:
+        # Spawn ile başlayan worker'lar embedding'leri .npy cache'inden mmap ile açar, yeniden encode etmez
+        load_engine(dataset_path)
+
+
+def score_chunk(chunk):
+    """Bir chunk'ı skorlar; (id, prompt, öneriler) listesi döner"""
+    user_inputs = [prompt for _, prompt in chunk]
+    results = _engine.recommend_many(user_inputs, top_k=_top_k, tolerance_percent=_tolerance, chunk_size=len(chunk))
+    return [
+        (row_id, prompt, [{field: recommendation[field] for field in OUTPUT_FIELDS} for recommendation in recommendations])
+        for (row_id, prompt), recommendations in zip(chunk, results)
+    ]
+
+
+def load_engine(dataset_path: str):
+    """
+    Ana süreç engine'i bir kez kurar (embedding cache'i yoksa burada yazılır);
+    fork ile açılan worker'lar bu örneği copy-on-write paylaşır
+    """
+    global _engine, _engine_path
+    _engine = HybridRecommendationEngine(dataset_path)
+    _engine_path = dataset_path
+    return _engine
+
+
+def score_stream(rows, dataset_path: str, top_k: int = 10, tolerance: float = 0.20,
+                 chunk_size: int = 256, workers: int = 1):
+    """Skorlanmış satırları girdi sırasıyla üreten generator (engine bu dataset için kurulmadıysa burada kurulur)"""
+    global _top_k, _tolerance
+    if _engine is None or _engine_path != dataset_path:
+        load_engine(dataset_path)
+    # Ana süreç thread ayarına dokunulmaz (--workers 1'de encoder tüm thread'leri kullanır);
+    # torch'u tek thread'e sabitleyen _init_worker sadece havuz worker'larında çalışır
+    _top_k = top_k
+    _tolerance = tolerance
+    chunks = chunked(rows, chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from score_chunk(chunk)
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with context.Pool(workers, initializer=_init_worker, initargs=(dataset_path, top_k, tolerance)) as pool:
+        # imap sırayı korur; havuzun önüne en fazla birkaç chunk okunur
+        for scored in pool.imap(score_chunk, chunks):
+            yield from scored
+
+
+def write_ndjson(scored, output):
+    for row_id, prompt, recommendations in scored:
+        output.write(json.dumps({'id': row_id, 'user_input': prompt, 'recommendations': recommendations},
+                                ensure_ascii=False) + '\n')
+        yield
+
+
+def write_csv(scored, output):
+    writer = csv.writer(output)
+    writer.writerow(['id', 'user_input', 'rank'] + OUTPUT_FIELDS)
+    for row_id, prompt, recommendations in scored:
+        for rank, recommendation in enumerate(recommendations, 1):
+            writer.writerow([row_id, prompt, rank] + [recommendation[field] for field in OUTPUT_FIELDS])
+        yield
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Prompt dosyasını Flask olmadan toplu skorlar')
+    parser.add_argument('input', nargs='?', default='-', help="Girdi dosyası ('-' = stdin)")
+    parser.add_argument('--dataset', required=True, help='Bölüm CSV dosyası')
+    parser.add_argument('-o', '--output', default='-', help="Çıktı dosyası ('-' = stdout)")
+    parser.add_argument('--input-format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--output-format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--column', default='user_input', help='Prompt alanı/kolonu')
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--tolerance', type=float, default=0.20)
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--report-every', type=float, default=5.0, help='rows/sec raporu aralığı (saniye)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Satır başına loglar toplu skorlamada çıktıyı boğar
+    logging.getLogger('Similarity_Prompt').setLevel(logging.WARNING)
+
+    source = output = None
+    try:
+        # Eksik girdi / yazılamayan çıktı yolu, model yüklenmeden ERROR mesajıyla raporlanır
+        source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+
+        # Engine kurulumu throughput'a dahil edilmez; saat ilk chunk okunmadan hemen önce başlar
+        load_engine(args.dataset)
+
+        rows = read_prompts(source, args.input_format, args.column)
+        scored = score_stream(rows, args.dataset, args.top_k, args.tolerance, args.chunk_size, args.workers)
+        writer = write_csv if args.output_format == 'csv' else write_ndjson
+
+        started = last_report = time.perf_counter()
+        count = 0
+        for _ in writer(scored, output):
+            count += 1
+            now = time.perf_counter()
+            if now - last_report >= args.report_every:
+                print(f"{count} rows, {count / (now - started):.1f} rows/sec", file=sys.stderr)
+                last_report = now
+
+        elapsed = time.perf_counter() - started
+        print(f"Done: {count} rows in {elapsed:.2f}s ({count / elapsed if elapsed else 0.0:.1f} rows/sec)", file=sys.stderr)
+    except (ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+        if output not in (None, sys.stdout):
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# ONNX Runtime ile CPU üzerinde sorgu encoder'ı
+# export_onnx_encoder.py'nin ürettiği, dinamik int8 quantize edilmiş transformer'ı onnxruntime ile çalıştırır.
+# Tokenizer için sadece `tokenizers` paketi gerekir; torch / sentence-transformers yüklenmez.
+# encode() imzası SentenceTransformer.encode ile uyumludur, engine ve mikro-batch kuyruğu değişmeden kullanır.
+import os
+import json
+import logging
+
+import numpy as np
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:
+    onnxruntime = None
+    Tokenizer = None
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = 'model_quantized.onnx'
+TOKENIZER_FILE = 'tokenizer.json'
+CONFIG_FILE = 'encoder_config.json'
+
+
+class OnnxSentenceEncoder:
+    backend = 'onnx'
+
+    def __init__(self, model_dir: str, intra_op_threads: int = None):
+        if onnxruntime is None:
+            raise ImportError("ONNX encoder için onnxruntime ve tokenizers gerekli: pip install onnxruntime tokenizers")
+
+        with open(os.path.join(model_dir, CONFIG_FILE), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        self.model_dir = model_dir
+        self.max_seq_length = self.config.get('max_seq_length', 128)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        pad_token = self.config.get('pad_token', '<pad>')
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token), pad_token=pad_token)
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Worker başına tek thread (torch ayarıyla aynı mantık); paralellik süreç sayısından gelir
+        options.intra_op_num_threads = intra_op_threads or int(os.environ.get('ONNX_NUM_THREADS', 1))
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, MODEL_FILE), options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        logger.info(f"ONNX encoder loaded from {model_dir}")
+
+    def _forward(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.input_names:
+            feeds['token_type_ids'] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        # SentenceTransformer'daki gibi attention mask ağırlıklı ortalama (mean pooling)
+        weights = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * weights).sum(axis=1)
+        return summed / np.maximum(weights.sum(axis=1), 1e-9)
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True, **kwargs):
+        """SentenceTransformer.encode ile aynı çağrı biçimi; float32 numpy dizi döner"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, self.config['dimension']), dtype=np.float32)
+
+        # Benzer uzunluktaki metinler aynı batch'e düşsün diye uzunluğa göre sıralanır (daha az padding)
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            positions = order[start:start + batch_size]
+            batches.append((positions, self._forward([texts[position] for position in positions])))
+
+        embeddings = np.empty((len(texts), batches[0][1].shape[1]), dtype=np.float32)
+        for positions, batch in batches:
+            embeddings[positions] = batch
+
+        if normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+    def memory_bytes(self):
+        return os.path.getsize(os.path.join(self.model_dir, MODEL_FILE))
@@ -0,0 +1,82 @@
+# Bölüm embedding matrisi için nicemlenmiş (quantized) depolama
+# float16: satır başına 2 byte/boyut; int8: satır başına ölçek (max|x| / 127) + 1 byte/boyut.
+# Skorlama sırasında satırlar blok blok float32'ye açılır (dequantize-on-score); geçici bellek
+# blok boyutuyla sınırlı kalır ve küçük blok cache'te tutulduğu için tarama bellek bant genişliğine takılmaz.
+# Matris ndarray gibi kullanılır: E @ q, E @ Q.T, E[ids], E.shape, len(E), E.nbytes.
+import numpy as np
+
+EMBEDDING_DTYPES = ('float32', 'float16', 'int8')
+
+# Skorlamada bir seferde float32'ye açılan satır sayısı
+BLOCK_ROWS = 4096
+
+
+class QuantizedEmbeddings:
+    # NumPy'ın E @ x ifadesinde bu nesneyi diziye çevirmeye çalışmaması için
+    __array_ufunc__ = None
+
+    def __init__(self, data, scales=None):
+        self.data = data
+        self.scales = scales
+        self.shape = data.shape
+        self.dtype = np.dtype(np.float32)
+
+    @classmethod
+    def quantize(cls, embeddings, dtype: str):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if dtype == 'float16':
+            return cls(embeddings.astype(np.float16))
+        if dtype == 'int8':
+            scales = np.abs(embeddings).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.rint(embeddings / scales[:, None]).astype(np.int8)
+            return cls(codes, scales.astype(np.float32))
+        raise ValueError(f"Desteklenmeyen embedding tipi: {dtype} (seçenekler: {', '.join(EMBEDDING_DTYPES)})")
+
+    @property
+    def storage_dtype(self):
+        return str(self.data.dtype)
+
+    @property
+    def nbytes(self):
+        return int(self.data.nbytes) + (int(self.scales.nbytes) if self.scales is not None else 0)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _dequantize(self, rows, ids=None):
+        block = rows.astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales if ids is None else self.scales[ids]
+            block *= scales[:, None]
+        return block
+
+    def __getitem__(self, ids):
+        """Seçilen satırların float32 karşılığı"""
+        ids = np.arange(len(self))[ids] if isinstance(ids, slice) else ids
+        return self._dequantize(self.data[ids], ids)
+
+    def __matmul__(self, other):
+        """E @ q (vektör) veya E @ Q.T (matris) - blok blok açılarak hesaplanır"""
+        other = np.asarray(other, dtype=np.float32)
+        result = np.empty((len(self),) + other.shape[1:], dtype=np.float32)
+        for start in range(0, len(self), BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, len(self))
+            block = self.data[start:end].astype(np.float32)
+            # int8'de ölçek çarpımdan sonra uygulanır: (codes @ q) * scale - blok tekrar ölçeklenmez
+            scores = block @ other
+            if self.scales is not None:
+                scores *= self.scales[start:end].reshape((-1,) + (1,) * (scores.ndim - 1))
+            result[start:end] = scores
+        return result
+
+    def __array__(self, dtype=None, copy=None):
+        array = self._dequantize(self.data)
+        return array if dtype is None else array.astype(dtype)
+
+
+def quantize_embeddings(embeddings, dtype: str = 'float32'):
+    """float32 için matris olduğu gibi döner; float16/int8 için QuantizedEmbeddings"""
+    if dtype == 'float32':
+        return embeddings
+    return QuantizedEmbeddings.quantize(embeddings, dtype)
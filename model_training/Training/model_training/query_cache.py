@@ -0,0 +1,83 @@
+# Sorgu embedding'leri için LRU cache
+# extract_interests_and_ranking çıktısı 15 kategoriden oluşan küçük bir uzaydır ("sağlık, teknoloji");
+# aynı ilgi alanı kombinasyonu için transformer tekrar çalıştırılmaz.
+import threading
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_interests(interests: str) -> str:
+    """Kategori sırasından bağımsız anahtar: küçük harf, tekil, alfabetik"""
+    categories = sorted({part.strip().lower() for part in interests.split(',') if part.strip()})
+    return ', '.join(categories)
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding):
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.flags.writeable = False
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return embedding
+
+    def __contains__(self, key: str):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+    def prewarm(self, model, categories, max_combination: int = 2, batch_size: int = 64):
+        """Tek ve ikili kategori kombinasyonlarını toplu encode ederek cache'e yazar"""
+        keys = []
+        for size in range(1, max_combination + 1):
+            for combination in itertools.combinations(categories, size):
+                key = normalize_interests(', '.join(combination))
+                if key not in self and key not in keys:
+                    keys.append(key)
+        if not keys:
+            return 0
+
+        embeddings = model.encode(keys, batch_size=batch_size, normalize_embeddings=True)
+        for key, embedding in zip(keys, embeddings):
+            self.put(key, embedding)
+        return len(keys)
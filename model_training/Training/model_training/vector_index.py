@@ -0,0 +1,189 @@
+# Benzersiz açıklama embedding'leri üzerinde değiştirilebilir vektör indeksi
+# Tüm backend'ler L2-normalize embedding'lerle iç çarpım (= kosinüs) kullanır ve aynı arayüzü sunar:
+#   search(query, k, mask=None) -> (ids, scores)   mask: indeks satırları için bool ön filtre
+# exact: NumPy brute force (referans), ivf: saf NumPy k-means kaba nicemleyici + inverted list,
+# hnsw: hnswlib (opsiyonel bağımlılık). Seçici maskelerde yaklaşık backend'ler maskelenmiş satırlar
+# üzerinde exact aramaya düşer; az sayıda satırı taramak graf/liste dolaşmaktan hem ucuz hem kesindir.
+import logging
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+# Maskede bu kadar veya daha az satır kaldığında exact tarama yapılır
+EXACT_FALLBACK_ROWS = 2048
+
+
+def _top_k(ids, scores, k: int):
+    """Skora göre azalan top-k; eşitlikte küçük id önce gelir"""
+    if len(scores) > k:
+        partition = np.argpartition(-scores, k - 1)[:k]
+        ids, scores = ids[partition], scores[partition]
+    order = np.lexsort((ids, -scores))
+    return ids[order], scores[order]
+
+
+class VectorIndex:
+    """Ortak arayüz; exact olmayan backend'ler sonuçları yaklaşık döndürür"""
+    name = None
+    exact = False
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def exact_search(self, query, k: int, ids=None):
+        """Verilen satırlar (None = hepsi) üzerinde brute-force top-k"""
+        if ids is None:
+            ids = np.arange(len(self.embeddings))
+            scores = self.embeddings @ query
+        else:
+            scores = self.embeddings[ids] @ query
+        return _top_k(ids, scores, k)
+
+    def _selective(self, mask, k: int):
+        """Maske yeterince seçiciyse exact taranacak id'ler, değilse None"""
+        if mask is None:
+            return None
+        ids = np.flatnonzero(mask)
+        return ids if len(ids) <= max(k, EXACT_FALLBACK_ROWS) else None
+
+    def search(self, query, k: int, mask=None):
+        raise NotImplementedError
+
+    def memory_bytes(self):
+        return 0
+
+
+class ExactIndex(VectorIndex):
+    name = 'exact'
+    exact = True
+
+    def search(self, query, k: int, mask=None):
+        if mask is None:
+            return self.exact_search(query, k)
+        return self.exact_search(query, k, np.flatnonzero(mask))
+
+
+class IVFIndex(VectorIndex):
+    """Küresel k-means ile n_lists kümeye bölünür; sorgu en yakın n_probe kümenin satırlarını tarar"""
+    name = 'ivf'
+
+    def __init__(self, embeddings, n_lists: int = None, n_probe: int = 8, iterations: int = 20, seed: int = 0,
+                 train_per_list: int = 64):
+        super().__init__(embeddings)
+        n = len(embeddings)
+        self.n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        self.n_probe = max(1, min(n_probe, self.n_lists))
+        self.centroids = self._train(embeddings, iterations, seed, train_per_list)
+
+        # Satırlar küme sırasıyla tek dizide; liste sınırları offsets ile tutulur
+        assignments = np.argmax(embeddings @ self.centroids.T, axis=1)
+        self.list_ids = np.argsort(assignments, kind='stable').astype(np.int64)
+        self.offsets = np.searchsorted(assignments[self.list_ids], np.arange(self.n_lists + 1))
+        logger.info(f"IVF index: {n} vectors, {self.n_lists} lists, n_probe={self.n_probe}")
+
+    def _train(self, embeddings, iterations: int, seed: int, train_per_list: int):
+        rng = np.random.default_rng(seed)
+        # Merkezler liste başına en fazla train_per_list örnekle eğitilir; atama tüm satırlarla yapılır
+        sample_size = min(len(embeddings), self.n_lists * train_per_list)
+        sample = np.sort(rng.choice(len(embeddings), sample_size, replace=False))
+        data = np.asarray(embeddings[sample], dtype=np.float32)
+        centroids = data[rng.choice(len(data), self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(data @ centroids.T, axis=1)
+            counts = np.bincount(assignments, minlength=self.n_lists)
+            # Küme toplamları satırlar kümeye göre sıralanıp reduceat ile alınır
+            order = np.argsort(assignments, kind='stable')
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(data[order], starts[filled], axis=0)
+            # Boş kalan kümeler rastgele bir noktaya yeniden yerleştirilir
+            empty = counts == 0
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+        return centroids.astype(np.float32)
+
+    def search(self, query, k: int, mask=None):
+        ids = self._selective(mask, k)
+        if ids is not None:
+            return self.exact_search(query, k, ids)
+
+        # Maske satırların bir kısmını elediği için problanan liste sayısı seçicilikle ölçeklenir
+        n_probe = self.n_probe
+        if mask is not None:
+            n_probe = min(self.n_lists, int(np.ceil(n_probe * len(mask) / max(1, np.count_nonzero(mask)))))
+        probe = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        ids = np.concatenate([self.list_ids[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+        if mask is not None:
+            ids = ids[mask[ids]]
+        if len(ids) < k:
+            # Problanan listeler k sonuç vermiyorsa tüm (maskelenmiş) satırlar taranır
+            return self.exact_search(query, k, None if mask is None else np.flatnonzero(mask))
+        return self.exact_search(query, k, ids)
+
+    def memory_bytes(self):
+        return int(self.centroids.nbytes + self.list_ids.nbytes + self.offsets.nbytes)
+
+
+class HNSWIndex(VectorIndex):
+    """hnswlib grafı; maske hnswlib'in filter callback'i ile uygulanır"""
+    name = 'hnsw'
+
+    def __init__(self, embeddings, m: int = 16, ef_construction: int = 200, ef: int = 64, seed: int = 0,
+                 search_depth: int = 0):
+        if hnswlib is None:
+            raise ImportError("HNSW index için hnswlib gerekli: pip install hnswlib")
+        super().__init__(embeddings)
+        # ef kurulumda bir kez ayarlanır: paylaşılan grafta sorgu başına set_ef thread'li worker'larda yarışır.
+        # Daha büyük k istenirse hnswlib aramayı zaten max(ef, k) genişliğinde yapar.
+        ef = max(ef, search_depth)
+        self.ef = ef
+        self.graph = hnswlib.Index(space='ip', dim=embeddings.shape[1])
+        self.graph.init_index(max_elements=len(embeddings), ef_construction=ef_construction, M=m, random_seed=seed)
+        self.graph.add_items(np.asarray(embeddings, dtype=np.float32), np.arange(len(embeddings)))
+        self.graph.set_ef(ef)
+        self.m = m
+        logger.info(f"HNSW index: {len(embeddings)} vectors, M={m}, ef={ef}")
+
+    def search(self, query, k: int, mask=None):
+        ids = self._selective(mask, k)
+        if ids is not None:
+            return self.exact_search(query, k, ids)
+
+        k = min(k, len(self) if mask is None else int(mask.sum()))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        accept = None if mask is None else (lambda label: bool(mask[label]))
+        labels, distances = self.graph.knn_query(query, k=k, filter=accept)
+        # 'ip' uzayında mesafe 1 - iç çarpımdır
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def memory_bytes(self):
+        # Katman-0 bağlantıları + vektör kopyası (yaklaşık)
+        return int(len(self) * (self.m * 2 * 4 + self.embeddings.shape[1] * 4))
+
+
+INDEX_BACKENDS = {
+    'exact': ExactIndex,
+    'ivf': IVFIndex,
+    'hnsw': HNSWIndex
+}
+
+
+def build_index(kind: str, embeddings, **params):
+    """Backend adıyla indeks kurar ('exact', 'ivf', 'hnsw')"""
+    try:
+        backend = INDEX_BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen vektör indeksi: {kind} (seçenekler: {', '.join(INDEX_BACKENDS)})")
+    return backend(embeddings, **params)
@@ -0,0 +1,105 @@
+# Vektör indeksi benchmark'ı: exact referansa göre recall@k ve saniyedeki sorgu sayısı (QPS)
+# Kullanım:
+#   python vector_index_benchmark.py --rows 100000 --queries 500 --k 10
+#   python vector_index_benchmark.py --embeddings ../../../Backend/Data/Sayisal_Bolumler_Aciklamali.embeddings.npy --replicate 200
+# --embeddings verilirse gerçek açıklama embedding'leri gürültüyle çoğaltılır (program varyantları / yıllar);
+# verilmezse kümelenmiş sentetik normalize vektörler üretilir. Her seçicilik için maske rastgele satırlardır.
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from vector_index import build_index, hnswlib
+
+
+def normalize(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def synthetic_embeddings(rows: int, dimension: int, clusters: int, rng):
+    centers = normalize(rng.standard_normal((clusters, dimension)))
+    assignments = rng.integers(0, clusters, rows)
+    return normalize(centers[assignments] + 0.35 * rng.standard_normal((rows, dimension)) / np.sqrt(dimension) * 4)
+
+
+def replicated_embeddings(path: str, replicate: int, noise: float, rng):
+    base = np.load(path).astype(np.float32)
+    copies = np.repeat(base, replicate, axis=0)
+    return normalize(copies + noise * rng.standard_normal(copies.shape) / np.sqrt(base.shape[1]))
+
+
+def make_queries(embeddings, count: int, noise: float, rng):
+    seeds = embeddings[rng.integers(0, len(embeddings), count)]
+    return normalize(seeds + noise * rng.standard_normal(seeds.shape) / np.sqrt(embeddings.shape[1]))
+
+
+def run_backend(index, queries, k: int, masks, truth):
+    recalls = []
+    started = time.perf_counter()
+    for query, mask, expected in zip(queries, masks, truth):
+        ids, _ = index.search(query, k, mask)
+        if len(expected):
+            recalls.append(len(set(ids.tolist()) & set(expected.tolist())) / len(expected))
+    elapsed = time.perf_counter() - started
+    return float(np.mean(recalls)) if recalls else 1.0, len(queries) / elapsed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Vektör indeksi recall@k / QPS karşılaştırması')
+    parser.add_argument('--embeddings', help='Gerçek embedding .npy dosyası (opsiyonel)')
+    parser.add_argument('--replicate', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=200)
+    parser.add_argument('--noise', type=float, default=0.3)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--selectivity', type=float, nargs='+', default=[1.0, 0.1, 0.01],
+                        help='Maskede kalan satır oranları (1.0 = maskesiz)')
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[4, 16])
+    parser.add_argument('--ef', type=int, nargs='+', default=[32, 128])
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    if args.embeddings:
+        embeddings = replicated_embeddings(args.embeddings, args.replicate, args.noise, rng)
+    else:
+        embeddings = synthetic_embeddings(args.rows, args.dimension, args.clusters, rng)
+    queries = make_queries(embeddings, args.queries, args.noise, rng)
+    print(f"{len(embeddings)} vectors x {embeddings.shape[1]} dims, {len(queries)} queries, k={args.k}")
+
+    backends = [('exact', {})]
+    backends += [('ivf', {'n_probe': n_probe}) for n_probe in args.n_probe]
+    if hnswlib is not None:
+        backends += [('hnsw', {'ef': ef}) for ef in args.ef]
+    else:
+        print("hnswlib yüklü değil - HNSW atlandı", file=sys.stderr)
+
+    indexes = []
+    for kind, params in backends:
+        started = time.perf_counter()
+        index = build_index(kind, embeddings, **params)
+        label = kind + ''.join(f" {key}={value}" for key, value in params.items())
+        indexes.append((label, index))
+        print(f"build {label:<16} {time.perf_counter() - started:8.2f}s  {index.memory_bytes() / 1e6:8.1f} MB")
+
+    exact = indexes[0][1]
+    print(f"\n{'backend':<18}{'selectivity':>12}{'recall@k':>10}{'QPS':>10}")
+    for selectivity in args.selectivity:
+        if selectivity >= 1.0:
+            masks = [None] * len(queries)
+        else:
+            masks = [rng.random(len(embeddings)) < selectivity for _ in queries]
+        truth = [exact.search(query, args.k, mask)[0] for query, mask in zip(queries, masks)]
+        for label, index in indexes:
+            recall, qps = run_backend(index, queries, args.k, masks, truth)
+            print(f"{label:<18}{selectivity:>12.3f}{recall:>10.3f}{qps:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()